@@ -0,0 +1,107 @@
+"""Seeded synthetic task generator for benchmarks.
+
+Distributions roughly follow a real personal task list: a few categories
+dominate (Zipf-like weights), most tasks carry zero to two tags, medium
+priority is the most common, due dates cluster around "today" with a long
+tail, about 40% of tasks are done (with start/end times) and a small share
+repeat. The same seed and size always produce the same tasks.
+
+Usage: python benchmarks/generate.py 10000 --seed 1 --output tasks.json
+"""
+import argparse
+import random
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.recurrence import RecurrenceRule
+from src.storage import Storage
+from src.task import Task
+
+BASE_DATE = date(2025, 1, 6)  # Fixed "today" so generated data never drifts
+
+CATEGORIES = ["Work", "Home", "Errands", "Health", "Finance", "Learning",
+              "Social", "Travel", "Garden", "Admin"]
+CATEGORY_WEIGHTS = [1 / (rank + 1) for rank in range(len(CATEGORIES))]
+TAGS = ["urgent", "phone", "email", "computer", "outside", "waiting",
+        "quick", "deep-work", "weekend", "shared"]
+PRIORITIES = ["low", "medium", "high"]
+PRIORITY_WEIGHTS = [0.3, 0.5, 0.2]
+VERBS = ["Buy", "Call", "Email", "Fix", "Review", "Write", "Plan", "Book",
+         "Clean", "Pay", "Schedule", "Update", "Prepare", "Read", "Organize"]
+OBJECTS = ["groceries", "quarterly report", "dentist", "car insurance", "kitchen",
+           "project proposal", "team meeting", "tax return", "flight", "garden fence",
+           "blog post", "budget", "presentation", "library books", "gym membership"]
+QUALIFIERS = ["", "", "", "for Monday", "with Alex", "before trip", "again", "online"]
+
+
+def generate_tasks(count, seed=0, today=BASE_DATE):
+    """
+    Build count synthetic tasks deterministically
+
+    :param count: Number of tasks
+    :param seed: Random seed; same seed and count give identical tasks
+    :param today: Date due dates and completion times are spread around
+    :return: List of Task objects
+    """
+    rng = random.Random(seed)
+    tasks = []
+    for i in range(count):
+        description = f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} {rng.choice(QUALIFIERS)}".strip()
+        category = rng.choices(CATEGORIES, CATEGORY_WEIGHTS)[0]
+        priority = rng.choices(PRIORITIES, PRIORITY_WEIGHTS)[0]
+        tags = rng.sample(TAGS, rng.choices([0, 1, 2, 3], [0.4, 0.35, 0.2, 0.05])[0])
+
+        due_date = None
+        if rng.random() < 0.6:
+            offset = int(rng.gauss(0, 20)) if rng.random() < 0.85 else rng.randint(-365, 365)
+            due_date = (today + timedelta(days=offset)).isoformat()
+
+        completed = rng.random() < 0.4
+        start_time = end_time = None
+        if completed:
+            end_time = datetime.combine(today, datetime.min.time()) - timedelta(
+                days=rng.randint(0, 400), minutes=rng.randint(0, 1440))
+            start_time = end_time - timedelta(minutes=int(rng.lognormvariate(3.5, 0.8)))
+
+        recurrence = None
+        if due_date and not completed and rng.random() < 0.03:
+            recurrence = rng.choice([
+                RecurrenceRule("daily", due_date),
+                RecurrenceRule("weekly", due_date),
+                RecurrenceRule("weekly", due_date, weekdays=[0, 1, 2, 3, 4]),
+                RecurrenceRule("monthly", due_date),
+            ])
+
+        tasks.append(Task(description, completed=completed, priority=priority,
+                          due_date=due_date, category=category, tags=tags,
+                          start_time=start_time, end_time=end_time,
+                          uid=f"{seed:04x}{i:028x}", recurrence=recurrence))
+    return tasks
+
+
+def generate_phrases(count, seed=0):
+    """Natural-language task phrases for NLP benchmarks (all distinct)"""
+    rng = random.Random(seed)
+    whens = ["tomorrow", "next week", "on Friday", "at 3pm", "today", "every Monday",
+             "every weekday", "first Monday of every month", "in 3 days", ""]
+    flags = ["", "", "urgent", "low priority", "asap"]
+    return [f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} {rng.choice(whens)} {rng.choice(flags)} #{i}".strip()
+            for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic task file")
+    parser.add_argument("count", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="tasks.json")
+    args = parser.parse_args()
+    Storage(args.output).save_tasks(generate_tasks(args.count, args.seed))
+    print(f"Wrote {args.count} tasks to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
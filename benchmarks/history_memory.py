@@ -0,0 +1,84 @@
+"""Undo history memory check.
+
+Records the same number of edits against task lists of different sizes and
+reports the memory the History holds (deep size of its stacks) and its file
+size, next to what copying the list once per edit would cost. History cost
+should track the number and kind of edits and stay flat as the list grows.
+
+Usage: python benchmarks/history_memory.py --sizes 1000,10000,100000 --edits 100
+"""
+import argparse
+import copy
+import json
+import random
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.generate import generate_tasks
+from src.history import History
+
+
+def deep_size(obj, seen=None):
+    """Approximate bytes held by obj and everything it references"""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)) or type(obj).__name__ == "deque":
+        size += sum(deep_size(item, seen) for item in obj)
+    return size
+
+
+def record_edits(tasks, edits, seed):
+    """Apply a seeded mix of edits, deletes and adds, recording each"""
+    rng = random.Random(seed)
+    history = History(limit=edits)
+    for i in range(edits):
+        kind = i % 4
+        if kind in (0, 1):
+            position = rng.randrange(len(tasks))
+            old = tasks[position]
+            new = copy.copy(old)
+            if kind == 0:
+                new.priority = rng.choice(["low", "medium", "high"])
+            else:
+                new.completed = not old.completed
+            tasks[position] = new
+            history.record_edit(old, new)
+        elif kind == 2:
+            position = rng.randrange(len(tasks))
+            history.record_delete(position, tasks.pop(position))
+        else:
+            tasks.append(copy.copy(tasks[0]))
+            history.record_add(tasks[-1])
+    return history
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--edits", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'Tasks':>8} {'Edits':>6} {'History KiB':>12} {'Bytes/edit':>11} "
+          f"{'File KiB':>9} {'Copy-per-edit KiB':>18}")
+    for size in (int(s) for s in args.sizes.split(",") if s):
+        tasks = generate_tasks(size, args.seed)
+        history = record_edits(tasks, args.edits, args.seed)
+        held = deep_size(history.undo_stack) + deep_size(history.redo_stack)
+        on_disk = len(json.dumps({"undo": list(history.undo_stack), "redo": []}))
+        # A shallow list copy per edit: just the pointer array, tasks shared
+        naive = args.edits * sys.getsizeof(list(tasks))
+        print(f"{size:>8} {args.edits:>6} {held / 1024:>12.1f} {held / args.edits:>11.0f} "
+              f"{on_disk / 1024:>9.1f} {naive / 1024:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
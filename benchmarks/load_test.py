@@ -0,0 +1,151 @@
+"""Load-test the HTTP API and report requests/sec and latency percentiles.
+
+By default a server is spawned on a free localhost port over a temporary task
+file seeded with --tasks tasks; pass --port to target a running server
+instead. Each connection issues a mix of conditional list polls, stats,
+searches and task creation over keep-alive HTTP/1.1.
+
+Usage: python benchmarks/load_test.py [--connections 32] [--duration 10] [--tasks 1000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+# Add the project root to Python path
+ROOT = Path(__file__).parent.parent
+sys.path.append(str(ROOT))
+
+from src.storage import Storage
+from src.task import Task
+
+
+async def request(reader, writer, method, path, body=None, headers=None):
+    """Send one request and read the full response; returns (status, headers, body)"""
+    payload = json.dumps(body).encode() if body is not None else b""
+    lines = [f"{method} {path} HTTP/1.1", "Host: localhost", f"Content-Length: {len(payload)}"]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + payload)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    response_headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode().partition(":")
+        response_headers[name.strip().lower()] = value.strip()
+    length = int(response_headers.get("content-length", 0))
+    return status, response_headers, await reader.readexactly(length) if length else b""
+
+
+async def client(host, port, deadline, seed, latencies, statuses):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    etag = None
+    try:
+        while time.perf_counter() < deadline:
+            roll = rng.random()
+            headers = {}
+            body = None
+            if roll < 0.6:
+                method, path = "GET", "/tasks?limit=20"
+                if etag:
+                    headers["If-None-Match"] = etag
+            elif roll < 0.75:
+                method, path = "GET", "/stats"
+            elif roll < 0.95:
+                method, path = "GET", f"/search?q=task+{rng.randrange(100)}&limit=20"
+            else:
+                method, path = "POST", "/tasks"
+                body = {"description": f"load test {seed}", "priority": "low"}
+            start = time.perf_counter()
+            status, response_headers, _ = await request(reader, writer, method, path, body, headers)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] += 1
+            if path.startswith("/tasks?"):
+                etag = response_headers.get("etag", etag)
+    finally:
+        writer.close()
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def spawn_server(tmp, tasks):
+    filename = os.path.join(tmp, "tasks.json")
+    Storage(filename).save_tasks([
+        Task(f"task {i}", priority=("low", "medium", "high")[i % 3], category=f"Cat{i % 7}")
+        for i in range(tasks)
+    ])
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "src.server", "--port", str(port), "--file", filename],
+        cwd=ROOT, stdout=subprocess.PIPE, text=True
+    )
+    process.stdout.readline()  # Wait for the "Serving ..." banner
+    return process, port
+
+
+async def run_load(host, port, connections, duration):
+    latencies, statuses = [], Counter()
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, deadline, seed, latencies, statuses)
+                           for seed in range(connections)))
+    return time.perf_counter() - start, latencies, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="Target a running server instead of spawning one")
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds")
+    parser.add_argument("--tasks", type=int, default=1000, help="Tasks to seed a spawned server with")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        process = None
+        port = args.port
+        if port is None:
+            process, port = spawn_server(tmp, args.tasks)
+        try:
+            elapsed, latencies, statuses = asyncio.run(
+                run_load(args.host, port, args.connections, args.duration))
+        finally:
+            if process:
+                process.terminate()
+                process.wait()
+
+    latencies.sort()
+    print(f"{len(latencies)} requests over {args.connections} connections in {elapsed:.2f}s")
+    print(f"Throughput: {len(latencies) / elapsed:.0f} requests/sec")
+    print(f"Latency: p50 {percentile(latencies, 50) * 1000:.2f} ms, "
+          f"p99 {percentile(latencies, 99) * 1000:.2f} ms, "
+          f"max {(latencies[-1] if latencies else 0) * 1000:.2f} ms")
+    print("Status codes: " + ", ".join(f"{code}: {n}" for code, n in sorted(statuses.items())))
+    return 0 if all(code < 500 for code in statuses) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
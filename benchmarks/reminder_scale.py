@@ -0,0 +1,93 @@
+"""Reminder scheduler scaling check.
+
+Loads N pending dated tasks into a ReminderScheduler and times the initial
+heap build plus add/edit/delete updates delivered through the TodoList
+listener, at several sizes. Per-update cost should grow roughly with log N,
+not N. Updates are fed to the listener directly so file saves don't drown
+out the heap work.
+
+Usage: python benchmarks/reminder_scale.py --sizes 1000,10000,100000
+"""
+import argparse
+import copy
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.reminders import ReminderScheduler
+from src.task import Task
+
+
+class ListStub:
+    """Just enough of TodoList for the scheduler: a task list and snapshot()"""
+
+    def __init__(self, tasks):
+        self.tasks = tasks
+
+    def snapshot(self):
+        return list(self.tasks)
+
+
+def pending_tasks(count, seed):
+    rng = random.Random(seed)
+    today = date.today()
+    return [Task(f"Task {i}", due_date=(today + timedelta(days=rng.randint(1, 365))).isoformat())
+            for i in range(count)]
+
+
+def bench(size, updates, seed):
+    rng = random.Random(seed)
+    tasks = pending_tasks(size, seed)
+    scheduler = ReminderScheduler(ListStub(tasks), notify=lambda task: None)
+
+    start = time.perf_counter()
+    scheduler.rebuild(tasks)
+    build = time.perf_counter() - start
+
+    today = date.today()
+    start = time.perf_counter()
+    for i in range(updates):
+        kind = i % 3
+        if kind == 0:
+            task = Task("New", due_date=(today + timedelta(days=rng.randint(1, 365))).isoformat())
+            tasks.append(task)
+            scheduler.on_change("add", None, task)
+        elif kind == 1:
+            position = rng.randrange(len(tasks))
+            old = tasks[position]
+            new = copy.copy(old)
+            new.due_date = (today + timedelta(days=rng.randint(1, 365))).isoformat()
+            tasks[position] = new
+            scheduler.on_change("edit", old, new)
+        else:
+            old = tasks.pop(rng.randrange(len(tasks)))
+            scheduler.on_change("delete", old, None)
+    update = (time.perf_counter() - start) / updates
+
+    # Everything comes due a year from now; time draining the whole heap
+    start = time.perf_counter()
+    fired = len(scheduler.pop_due(datetime.now() + timedelta(days=400)))
+    drain = time.perf_counter() - start
+    return build, update, fired, drain
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--updates", type=int, default=30000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'Tasks':>8} {'Build ms':>10} {'Update us':>10} {'Fired':>8} {'Drain ms':>10}")
+    for size in (int(s) for s in args.sizes.split(",") if s):
+        build, update, fired, drain = bench(size, args.updates, args.seed)
+        print(f"{size:>8} {build * 1000:>10.1f} {update * 1e6:>10.2f} {fired:>8} {drain * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""Reproducible benchmark suite for storage, queries and NLP.
+
+Runs each benchmark on seeded synthetic task lists (see generate.py) at the
+requested sizes, prints a table, optionally writes the results as JSON and
+compares them with a saved baseline, flagging any benchmark whose median got
+slower than the allowed threshold.
+
+Usage:
+    python benchmarks/run.py --sizes 1000,10000 --output results.json
+    python benchmarks/run.py --save-baseline benchmarks/baseline.json
+    python benchmarks/run.py --baseline benchmarks/baseline.json --threshold 0.2
+    python benchmarks/run.py --sizes 1000000 --only load,save,stats
+    python benchmarks/run.py --storage json,snapshot --only load,save,stats
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.generate import generate_phrases, generate_tasks
+from src.app import TodoList
+from src.recurrence import RecurrenceRule
+from src.storage import Storage
+
+
+def measure(func, repeat, setup=None):
+    """Run func repeat times (after optional setup each time); returns timings"""
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(timings, ops=1):
+    median = statistics.median(timings)
+    return {
+        "median_s": median,
+        "min_s": min(timings),
+        "runs": len(timings),
+        "ops_per_s": ops / median if median else None
+    }
+
+
+STORAGE_EXTENSIONS = {"json": ".json", "snapshot": ".tdb"}
+
+
+def bench_size(size, seed, repeat, only, tmp, extension=".json"):
+    """Run the task-list benchmarks at one size; returns {name: summary}"""
+    results = {}
+    filename = os.path.join(tmp, f"tasks-{size}{extension}")
+    tasks = generate_tasks(size, seed)
+    Storage.for_file(filename).save_tasks(tasks)
+    # Archiving off: every run measures the same full list
+    todo = TodoList(Storage.for_file(filename), archive_after_days=None)
+
+    def want(name):
+        return not only or name in only
+
+    if want("load"):
+        results["load"] = summarize(measure(lambda: Storage.for_file(filename).load_tasks(), repeat))
+    if want("save"):
+        results["save"] = summarize(measure(lambda: todo.storage.save_tasks(todo.tasks), repeat))
+    if want("search"):
+        results["search.term"] = summarize(measure(lambda: todo.search_tasks("report"), repeat))
+        results["search.filters"] = summarize(measure(
+            lambda: todo.search_tasks(category="Work", tags=["urgent"], priority="high"), repeat))
+        results["search.due_within"] = summarize(measure(lambda: todo.search_tasks(due_within=7), repeat))
+    if want("view"):
+        results["view.priority"] = summarize(measure(lambda: list(todo.view_tasks(sort_by="priority")), repeat))
+        results["view.due_date"] = summarize(measure(lambda: list(todo.view_tasks(sort_by="due_date")), repeat))
+        # A first screenful, as the CLI and paginated API need
+        results["view.first50"] = summarize(measure(
+            lambda: list(itertools.islice(todo.view_tasks(sort_by="priority_due"), 50)), repeat))
+    if want("stats"):
+        results["stats"] = summarize(measure(todo.get_stats, repeat))
+        # On a list nothing has read yet, as a one-shot `main.py stats` sees it
+        fresh = []
+
+        def reopen():
+            fresh[:] = [TodoList(Storage.for_file(filename), archive_after_days=None)]
+        results["stats.fresh"] = summarize(measure(lambda: fresh[0].get_stats(), repeat, setup=reopen))
+    if want("habits"):
+        results["habits"] = summarize(measure(todo.analyze_habits, repeat))
+    if want("mutation"):
+        # One add (including its save and view updates), undone outside the
+        # timed region. Runs last: the undo bypasses the list's change events
+        def undo():
+            with todo.lock.write_lock():
+                del todo.tasks[size:]
+        results["mutation"] = summarize(measure(
+            lambda: todo.add_task("Benchmark task", priority="high"), repeat, setup=undo))
+        undo()
+    return results
+
+
+def bench_nlp(seed, repeat, count=500):
+    """Phrase parsing throughput; full NLP needs dateparser installed"""
+    results = {}
+    phrases = generate_phrases(count, seed)
+    results["recurrence.parse"] = summarize(
+        measure(lambda: [RecurrenceRule.from_text(p) for p in phrases], repeat), ops=count)
+    try:
+        from src.nlp_processor import NLPProcessor
+    except ImportError as e:
+        print(f"Skipping nlp.parse: {e}")
+        return results
+
+    def parse_all():
+        # A fresh processor each run so the lru_cache starts cold
+        processor = NLPProcessor()
+        for phrase in phrases:
+            processor.parse_command(phrase)
+    results["nlp.parse"] = summarize(measure(parse_all, repeat), ops=count)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return [(key, baseline median, current median, ratio)] for regressions"""
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if not previous:
+            continue
+        ratio = current["median_s"] / previous["median_s"] if previous["median_s"] else 1.0
+        if ratio > 1 + threshold:
+            regressions.append((key, previous["median_s"], current["median_s"], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="Comma separated task counts (1000000 works but needs a few GB of RAM)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", default="",
+                        help="Comma separated subset: load,save,mutation,search,view,stats,habits,nlp")
+    parser.add_argument("--storage", default="json",
+                        help="Comma separated storage formats to run: json,snapshot")
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--baseline", help="Compare against this results JSON")
+    parser.add_argument("--save-baseline", help="Write results JSON as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown vs baseline before flagging (default 0.25 = 25%%)")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    only = {name for name in args.only.split(",") if name}
+    storages = [name for name in args.storage.split(",") if name]
+    unknown = set(storages) - set(STORAGE_EXTENSIONS)
+    if unknown:
+        parser.error(f"unknown storage format(s): {', '.join(sorted(unknown))}")
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            # Fewer repeats for big lists keeps 1M-task runs tolerable
+            repeat = max(1, args.repeat if size <= 100000 else args.repeat // 2)
+            for storage in storages:
+                # JSON keeps the plain "<size>/<name>" keys so old baselines still match
+                prefix = f"{size}/" if storage == "json" else f"{storage}/{size}/"
+                for name, summary in bench_size(size, args.seed, repeat, only, tmp,
+                                                STORAGE_EXTENSIONS[storage]).items():
+                    results[prefix + name] = summary
+    if not only or "nlp" in only:
+        results.update(bench_nlp(args.seed, args.repeat))
+
+    print(f"{'Benchmark':<28} {'Median ms':>11} {'Min ms':>11} {'Ops/s':>12}")
+    for key, summary in results.items():
+        print(f"{key:<28} {summary['median_s'] * 1000:>11.3f} {summary['min_s'] * 1000:>11.3f} "
+              f"{summary['ops_per_s'] or 0:>12.0f}")
+
+    document = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "sizes": sizes,
+            "storage": storages
+        },
+        "results": results
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(document, f, indent=2)
+            print(f"Results written to {path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nREGRESSIONS (> {args.threshold:.0%} slower than baseline):")
+            for key, before, after, ratio in regressions:
+                print(f"  {key:<28} {before * 1000:.3f} ms -> {after * 1000:.3f} ms ({ratio:.2f}x)")
+            return 1
+        print(f"\nNo regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
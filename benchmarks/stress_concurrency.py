@@ -0,0 +1,112 @@
+"""Hammer a shared TodoList from many threads and check it stays consistent.
+
+Writers add, edit, toggle and delete tasks while readers search, view and
+compute statistics. At the end the in-memory list, the saved JSON file and the
+bookkeeping of the writer threads must all agree.
+
+Usage: python benchmarks/stress_concurrency.py [--writers 4] [--readers 4] [--ops 200]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.app import TodoList
+from src.storage import Storage
+
+
+def writer(todo, ops, seed, added, errors):
+    rng = random.Random(seed)
+    try:
+        for i in range(ops):
+            todo.add_task(f"writer {seed} task {i}",
+                          priority=rng.choice(["low", "medium", "high"]),
+                          category=rng.choice(["Work", "Home", "Errands"]))
+            added[seed] += 1
+            tasks = todo.snapshot()
+            if not tasks:
+                continue
+            task_id = rng.randrange(len(tasks))
+            try:
+                action = rng.random()
+                if action < 0.4:
+                    todo.edit_task(task_id, priority=rng.choice(["low", "high"]))
+                elif action < 0.7:
+                    todo.mark_completed(task_id, rng.random() < 0.5)
+                elif action < 0.8:
+                    todo.delete_task(task_id)
+                    added[seed] -= 1
+            except IndexError:
+                # Another writer shrank the list after our snapshot
+                pass
+    except Exception as e:
+        errors.append(e)
+
+
+def reader(todo, stop, counts, errors):
+    try:
+        while not stop.is_set():
+            stats = todo.get_stats()
+            if stats["total"] != sum(stats["by_priority"].values()):
+                raise AssertionError(f"Torn statistics: {stats}")
+            todo.search_tasks("task", priority="high")
+            todo.view_page(sort_by="due_date")
+            counts.append(1)
+    except Exception as e:
+        errors.append(e)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--ops", type=int, default=200, help="adds per writer")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "tasks.json")
+        todo = TodoList(Storage(filename))
+        added = {seed: 0 for seed in range(args.writers)}
+        errors, reads = [], []
+        stop = threading.Event()
+
+        writers = [threading.Thread(target=writer, args=(todo, args.ops, seed, added, errors))
+                   for seed in range(args.writers)]
+        readers = [threading.Thread(target=reader, args=(todo, stop, reads, errors))
+                   for _ in range(args.readers)]
+
+        start = time.perf_counter()
+        for t in readers + writers:
+            t.start()
+        for t in writers:
+            t.join()
+        stop.set()
+        for t in readers:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+        expected = sum(added.values())
+        on_disk = len(Storage(filename).load_tasks())
+        print(f"{args.writers} writers x {args.ops} adds, {args.readers} readers "
+              f"({len(reads)} read passes) in {elapsed:.2f}s")
+        print(f"Expected {expected} tasks, in memory {len(todo.tasks)}, on disk {on_disk}")
+
+        if errors:
+            for e in errors:
+                print(f"Error: {e!r}")
+        if errors or not expected == len(todo.tasks) == on_disk:
+            print("FAILED")
+            return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
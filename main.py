@@ -1,7 +1,27 @@
-from src.cli import TodoCLI
+import os
+import sys
+from contextlib import nullcontext
 
 if __name__ == "__main__":
-    print("=== ULTIMATE TO-DO LIST MANAGER ===")
-    print("Professional Task Management System\n")
-    cli = TodoCLI()
-    cli.run()
\ No newline at end of file
+    argv = sys.argv[1:]
+    session = nullcontext()
+    if "--profile" in argv:
+        # Profile the whole session (interactive or scripted)
+        argv.remove("--profile")
+        from src import instrumentation
+        session = instrumentation.profile_session()
+    elif os.getenv("TODO_METRICS"):
+        from src import instrumentation
+        instrumentation.enable()
+
+    with session:
+        if argv:
+            # Scripted use: skip the interactive CLI and its AI/NLP/voice setup
+            from src.commands import main
+            sys.exit(main(argv))
+
+        from src.cli import TodoCLI
+        print("=== ULTIMATE TO-DO LIST MANAGER ===")
+        print("Professional Task Management System\n")
+        cli = TodoCLI()
+        cli.run()
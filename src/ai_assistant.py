@@ -1,6 +1,7 @@
 import os
 import openai
 from dotenv import load_dotenv
+from src import instrumentation
 
 class AIAssistant:
     """GPT-powered task intelligence"""
@@ -15,6 +16,7 @@ class AIAssistant:
         Your job is to provide helpful suggestions based on the current list and the user's request.
         """
     
+    @instrumentation.timed("ai.suggestions")
     def get_suggestions(self, tasks, query):
         """Get AI suggestions for task management"""
         try:
@@ -32,8 +34,10 @@ class AIAssistant:
             
             return response.choices[0].message['content'].strip()
         except Exception as e:
+            instrumentation.count("ai.errors")
             return f"AI service unavailable: {str(e)}"
     
+    @instrumentation.timed("ai.categorize")
     def auto_categorize(self, task_description):
         """Automatically categorize tasks using AI"""
         try:
@@ -48,4 +52,5 @@ class AIAssistant:
             )
             return response.choices[0].message['content'].strip()
         except:
+            instrumentation.count("ai.errors")
             return "General"
\ No newline at end of file
@@ -1,32 +1,144 @@
 from src.task import Task
 from src.storage import Storage
-from datetime import datetime, timedelta
+from src.archive import ARCHIVE_AFTER_DAYS, Archive, completed_before
+from src.history import History
+from src.fuzzy import TrigramIndex
+from src.sort_views import ADDED, SortedViews
+from src.rwlock import ReadWriteLock
+from src import instrumentation
+from datetime import date, datetime, timedelta
+import copy
+import itertools
 from collections import defaultdict
-import numpy as np
-from sklearn.linear_model import LinearRegression
+from contextlib import contextmanager
 
 class TodoList:
-    """Main application controller for to-do list operations"""
+    """Main application controller for to-do list operations
     
-    def __init__(self):
-        self.storage = Storage()
+    Safe to share between threads (e.g. the CLI and the voice assistant):
+    mutations take an exclusive write lock while searches and statistics run
+    concurrently under a shared read lock. Edits are copy-on-write, so the
+    lists returned by read methods are snapshots that later changes to the
+    to-do list never alter.
+    
+    Tasks completed more than archive_after_days ago are moved to a
+    compressed archive when the list is opened, keeping them out of every
+    load, save, view and search; see archive_completed.
+    
+    Adds, edits and deletes can be reverted with undo/redo (see History).
+    """
+    
+    def __init__(self, storage=None, archive=None, archive_after_days=ARCHIVE_AFTER_DAYS,
+                 history=None):
+        """
+        :param storage: Storage handler (default: Storage() on tasks.json)
+        :param archive: Archive for old completed tasks (default: next to the task file)
+        :param archive_after_days: Days after completion before a task is
+                                   archived automatically (None: never)
+        :param history: Undo/redo History (default: persisted next to the task file)
+        """
+        self.storage = storage or Storage()
+        self.archive = archive or Archive.for_storage(self.storage)
+        self.archive_after_days = archive_after_days
+        self.history = history or History.for_storage(self.storage)
+        self.lock = ReadWriteLock()
         self.tasks = self.storage.load_tasks()
+        self.revision = 0  # Bumped on every change, e.g. for HTTP ETags
+        self._batch_depth = 0
+        self._dirty = False
+        self._listeners = []
+        self._fuzzy_index = None  # Built on first fuzzy_search
+        self._sort_views = SortedViews()  # Each order built on first view_tasks
+        self._sort_views.follow(self)
+        if archive_after_days is not None:
+            self.archive_completed()
     
     def add_task(self, description, **kwargs):
         """Add new task to the list"""
         if not description.strip():
             raise ValueError("Task description cannot be empty")
-        self.tasks.append(Task(description, **kwargs))
-        self.save()
+        task = Task(description, **kwargs)
+        with self.lock.write_lock():
+            self.tasks.append(task)
+            self._notify("add", None, task)
+            self.history.record_add(task)
+            self.save()
+        return task
+    
+    def get_task(self, task_id):
+        """Return the task at a list position"""
+        with self.lock.read_lock():
+            try:
+                return self.tasks[task_id]
+            except IndexError:
+                raise IndexError("Invalid task ID")
+    
+    def index_of(self, uid):
+        """Return the list position of the task with the given uid"""
+        with self.lock.read_lock():
+            # Snapshot-backed lists look uids up without decoding records
+            find = getattr(self.tasks, "index_of_uid", None)
+            if find:
+                index = find(uid)
+                if index is not None:
+                    return index
+            else:
+                for i, task in enumerate(self.tasks):
+                    if task.uid == uid:
+                        return i
+        raise IndexError("Invalid task ID")
+    
+    def snapshot(self):
+        """Return a point-in-time copy of the task list"""
+        with self.lock.read_lock():
+            return list(self.tasks)
     
-    def edit_task(self, task_id, description=None, category=None, completed=None, priority=None, tags=None, due_date=None):
-        """Modify existing task attributes"""
-        try:
-            task = self.tasks[task_id]
+    def subscribe(self, listener):
+        """
+        Call listener(event, old, new) after every change to the task list
+        
+        Events: "add" (None, task), "edit" (old task, new task), "delete"
+        (task, None) and "reset" (None, None) when the whole list may have
+        changed (reload, merge, archiving). Listeners run on the mutating
+        thread with the write lock held, so they must be quick.
+        """
+        with self.lock.write_lock():
+            self._listeners.append(listener)
+    
+    def unsubscribe(self, listener):
+        with self.lock.write_lock():
+            self._listeners.remove(listener)
+    
+    def _notify(self, event, old, new):
+        for listener in self._listeners:
+            try:
+                listener(event, old, new)
+            except Exception as e:
+                print(f"Error in task listener: {e}")
+    
+    def _replace_task(self, task_id):
+        """Swap in a private copy of a task so readers keep the old version"""
+        task = copy.copy(self.tasks[task_id])
+        task.tags = list(task.tags)
+        self.tasks[task_id] = task
+        return task
+    
+    def edit_task(self, task_id, description=None, category=None, completed=None, priority=None, tags=None, due_date=None,
+                  recurrence=None, clear_recurrence=False):
+        """
+        Modify existing task attributes
+        
+        :param clear_recurrence: Make a recurring task a one-off (it keeps its
+                                 current due date)
+        """
+        with self.lock.write_lock():
+            try:
+                old = self.tasks[task_id]
+                task = self._replace_task(task_id)
+            except IndexError:
+                raise IndexError("Invalid task ID")
             if description:
                 task.description = description
-            if completed is not None:
-                task.completed = completed
             if category:
                 task.category = category
             if priority:
@@ -35,54 +147,270 @@ class TodoList:
                 task.tags = tags
             if due_date:
                 task.due_date = due_date
+            if clear_recurrence:
+                task.recurrence = None
+            if recurrence:
+                task.recurrence = recurrence
+                if not due_date:
+                    # Move the pending occurrence onto the new rule's schedule
+                    current = date.fromisoformat(task.due_date) if task.due_date else None
+                    first = next(recurrence.occurrences(after=current), None)
+                    if first is not None:
+                        task.due_date = first.isoformat()
+            if completed is not None:
+                self._set_completed(task, completed)
+            self._notify("edit", old, task)
+            self.history.record_edit(old, task)
             self.save()
             return task
-        except IndexError:
-            raise IndexError("Invalid task ID")
+    
+    def _set_completed(self, task, completed):
+        """Update completion; a recurring task rolls over to its next occurrence"""
+        if completed and task.recurrence is not None and task.due_date:
+            next_due = task.recurrence.next_after(date.fromisoformat(task.due_date))
+            if next_due is not None:
+                task.due_date = next_due.isoformat()
+                task.completed = False
+                return
+        if completed and not task.completed and task.end_time is None:
+            task.complete()  # Completion time decides when the task is archived
+        elif not completed:
+            task.end_time = None
+        task.completed = completed
+    
+    def archive_completed(self, older_than_days=None):
+        """
+        Move tasks completed more than older_than_days ago to the archive
+        
+        :param older_than_days: Age in days (default: archive_after_days, or
+                                ARCHIVE_AFTER_DAYS if automatic archiving is off)
+        :return: Number of tasks archived
+        """
+        if older_than_days is None:
+            older_than_days = self.archive_after_days
+            if older_than_days is None:
+                older_than_days = ARCHIVE_AFTER_DAYS
+        cutoff = datetime.now() - timedelta(days=older_than_days)
+        with self.lock.write_lock(), self.storage.lock():
+            # Start from the latest file so two sessions never archive a task twice
+            self.reload_if_changed()
+            find = getattr(self.tasks, "completed_before", None)
+            positions = find(cutoff) if find else \
+                        [i for i, t in enumerate(self.tasks) if completed_before(t, cutoff)]
+            if not positions:
+                return 0
+            self.archive.append([self.tasks[i] for i in positions])
+            delete = getattr(self.tasks, "delete_positions", None)
+            if delete:
+                delete(positions)
+            else:
+                archived = set(positions)
+                self.tasks = [t for i, t in enumerate(self.tasks) if i not in archived]
+            self._notify("reset", None, None)
+            self.save()
+        return len(positions)
     
     def view_tasks(self, filter_completed=None, sort_by="priority"):
         """
-        Get tasks with filtering and sorting
+        Iterate over tasks with filtering and sorting
+        
+        Sorted orders come from views maintained as tasks change, so getting
+        the first k rows costs O(k) rather than a full sort. The list itself
+        is never reordered.
         
         :param filter_completed: None (all), True (completed), False (pending)
-        :param sort_by: 'priority', 'due_date', or 'added'
-        :return: Filtered and sorted list of tasks
+        :param sort_by: 'priority', 'due_date', 'category', 'priority_due',
+                        'due_priority', or 'added' (list order)
+        :return: Iterator over a point-in-time version of the ordering
         """
+        with self.lock.read_lock():
+            if sort_by in ADDED:
+                # Snapshot-backed lists copy their entries without decoding them
+                frozen = getattr(self.tasks, "frozen_iter", None)
+                tasks = frozen() if frozen else list(self.tasks)
+            else:
+                tasks = self._sort_views.view(sort_by)
+        
         # Filtering
-        tasks = self.tasks if filter_completed is None else \
-                [t for t in self.tasks if t.completed == filter_completed]
-        
-        # Sorting
-        if sort_by == "priority":
-            priority_order = {"high": 0, "medium": 1, "low": 2}
-            tasks.sort(key=lambda t: priority_order[t.priority])
-        elif sort_by == "due_date":
-            tasks.sort(key=lambda t: t.due_date or "9999-12-31")  # Put undated last
-        # Default is added order (no sort needed)
-        
-        return tasks
+        if filter_completed is None:
+            return iter(tasks)
+        return (t for t in tasks if t.completed == filter_completed)
+    
+    @instrumentation.timed("todo.view")
+    def view_page(self, filter_completed=None, sort_by="priority", offset=0, limit=None):
+        """
+        One page of view_tasks as a list, reading only offset + limit rows
+        (only limit in unfiltered list order)
+        
+        :param offset: Rows to skip
+        :param limit: Maximum number of rows (None: all the rest)
+        """
+        stop = None if limit is None else offset + limit
+        if sort_by in ADDED and filter_completed is None:
+            with self.lock.read_lock():
+                return self.tasks[offset:stop]
+        return list(itertools.islice(self.view_tasks(filter_completed, sort_by), offset, stop))
+    
+    def count_tasks(self, filter_completed=None):
+        """Number of tasks view_tasks(filter_completed) yields, without a scan"""
+        with self.lock.read_lock():
+            if filter_completed is None:
+                return len(self.tasks)
+            return self._sort_views.count(filter_completed)
+    
     def mark_completed(self, task_id, completed=True):
         """Update task completion status"""
-        try:
-            self.tasks[task_id].completed = completed
+        with self.lock.write_lock():
+            try:
+                old = self.tasks[task_id]
+                task = self._replace_task(task_id)
+            except IndexError:
+                raise IndexError("Invalid task ID")
+            self._set_completed(task, completed)
+            self._notify("edit", old, task)
+            self.history.record_edit(old, task)
             self.save()
-        except IndexError:
-            raise IndexError("Invalid task ID")
+            return task
     
     def delete_task(self, task_id):
         """Remove task from list"""
-        try:
-            self.tasks.pop(task_id)
+        with self.lock.write_lock():
+            try:
+                index = range(len(self.tasks))[task_id]
+                task = self.tasks.pop(index)
+            except IndexError:
+                raise IndexError("Invalid task ID")
+            self._notify("delete", task, None)
+            self.history.record_delete(index, task)
+            self.save()
+            return task
+    
+    def undo(self):
+        """
+        Revert the most recent add, edit or delete (a batch counts as one)
+        
+        :return: The task affected, or None if there is nothing to undo
+        """
+        return self._replay(undoing=True)
+    
+    def redo(self):
+        """
+        Re-apply the most recently undone change
+        
+        :return: The task affected, or None if there is nothing to redo
+        """
+        return self._replay(undoing=False)
+    
+    def _replay(self, undoing):
+        with self.lock.write_lock(), self.storage.lock():
+            if self._batch_depth:
+                # The batch's own steps are not on the stacks until it ends
+                raise ValueError("Cannot undo or redo inside a batch")
+            # The step may come from another session: see its tasks first
+            self.reload_if_changed()
+            with self.history.updating():
+                source, target = self.history.undo_stack, self.history.redo_stack
+                if not undoing:
+                    source, target = target, source
+                if not source:
+                    return None
+                step = source.pop()
+                try:
+                    inverse, task = self._apply(step)
+                except IndexError:
+                    raise IndexError("The task this change affected no longer exists")
+                target.append(inverse)
             self.save()
-        except IndexError:
-            raise IndexError("Invalid task ID")
+            return task
+    
+    def _apply(self, step):
+        """Apply a history step; returns (the step reversing it, the task affected)"""
+        kind = step["op"]
+        if kind == "group":
+            # Steps were recorded in order, so undo them last to first
+            inverses, task = [], None
+            for op in reversed(step["ops"]):
+                try:
+                    inverse, task = self._apply(op)
+                except IndexError:
+                    continue  # Skip parts whose task has since gone
+                inverses.append(inverse)
+            if not inverses:
+                raise IndexError("Invalid task ID")
+            return {"op": "group", "ops": inverses}, task
+        if kind == "insert":
+            task = Storage.task_from_dict(step["task"])
+            self.tasks.insert(min(step["index"], len(self.tasks)), task)
+            self._notify("add", None, task)
+            return {"op": "delete", "uid": task.uid}, task
+        index = self.index_of(step["uid"])
+        if kind == "delete":
+            task = self.tasks.pop(index)
+            self._notify("delete", task, None)
+            return {"op": "insert", "index": index, "task": Storage.task_to_dict(task)}, task
+        old = self.tasks[index]
+        current = Storage.task_to_dict(old)
+        task = Storage.task_from_dict({**current, **step["fields"]})
+        self.tasks[index] = task
+        self._notify("edit", old, task)
+        fields = {name: current[name] for name in step["fields"]}
+        return {"op": "update", "uid": old.uid, "fields": fields}, task
     
     def save(self):
-        """Persist current state to storage"""
-        self.storage.save_tasks(self.tasks)
+        """Persist current state to storage, merging other sessions' edits"""
+        with self.lock.write_lock():
+            if self._batch_depth:
+                self._dirty = True
+                return
+            self.tasks = self.storage.save_tasks(self.tasks)
+            self.revision += 1
+            if self.storage.merged:
+                # Other sessions' edits came in with the merge
+                self._notify("reset", None, None)
+    
+    @contextmanager
+    def batch(self):
+        """
+        Apply many mutations with a single save at the end
+        
+        Holds the write lock for the whole block, so other threads see either
+        none or all of the batch.
+        """
+        with self.lock.write_lock():
+            if not self._batch_depth:
+                self.history.begin_group()  # The whole batch undoes as one step
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self.history.end_group()
+                    if self._dirty:
+                        self._dirty = False
+                        self.save()
     
+    def reload_if_changed(self):
+        """
+        Reload tasks if another process saved the file since we last saw it
+        
+        Costs a single stat() when nothing changed.
+        
+        :return: True if the task list was reloaded
+        """
+        if not self.storage.has_changed():
+            return False
+        with self.lock.write_lock():
+            if not self.storage.has_changed():
+                return False
+            self.tasks = self.storage.load_tasks()
+            self.revision += 1
+            self._notify("reset", None, None)
+        return True
+    
+    @instrumentation.timed("todo.search")
     def search_tasks(self, search_term="", category=None, tags=None, 
-                    priority=None, due_within=None):
+                    priority=None, due_within=None, include_archived=False):
         """
         Search tasks with multiple criteria
         
@@ -90,10 +418,15 @@ class TodoList:
         :param category: Filter by category
         :param tags: List of tags to match (any)
         :param priority: Filter by priority
-        :param due_within: Days until due (e.g., 7 for tasks due within a week)
+        :param due_within: Days until due (e.g., 7 for tasks due within a week);
+                           recurring tasks match if any occurrence falls inside
+        :param include_archived: Also search archived tasks (listed after the
+                                 active ones; slower, the archive is decompressed)
         :return: Filtered list of tasks
         """
-        results = self.tasks
+        results = self.snapshot()
+        if include_archived:
+            results += self.archive.tasks()
         
         # Apply filters
         if search_term:
@@ -114,34 +447,64 @@ class TodoList:
             end_date = today + timedelta(days=due_within)
             results = [
                 t for t in results 
-                if t.due_date and 
-                today <= datetime.strptime(t.due_date, "%Y-%m-%d").date() <= end_date
+                if next(t.due_dates(today, end_date), None) is not None
             ]
             
         return results
     
+    @instrumentation.timed("todo.fuzzy")
+    def fuzzy_search(self, query, limit=5, min_score=0.3):
+        """
+        Find tasks whose description resembles query, tolerating typos
+        
+        The trigram index is built on first use and then kept current
+        incrementally as tasks change.
+        
+        :param query: Text to look for (e.g. a voice transcription)
+        :param limit: Maximum number of results
+        :param min_score: Similarity (0-1) a task needs to be returned
+        :return: [(task, score)] best match first
+        """
+        if self._fuzzy_index is None:
+            with self.lock.write_lock():
+                if self._fuzzy_index is None:
+                    index = TrigramIndex()
+                    index.follow(self)
+                    self._fuzzy_index = index
+        return self._fuzzy_index.search(query, limit, min_score)
+    
+    @instrumentation.timed("todo.stats")
     def get_stats(self):
         """Calculate productivity statistics"""
-        stats = {
-            "total": len(self.tasks),
-            "completed": sum(1 for t in self.tasks if t.completed),
-            "by_priority": defaultdict(int),
-            "by_category": defaultdict(int),
-            "overdue": 0
-        }
-        
-        today = datetime.today().date()
+        yesterday = datetime.today().date() - timedelta(days=1)
+        with self.lock.read_lock():
+            # Snapshot-backed lists count undecoded records from their columns
+            column_stats = getattr(self.tasks, "column_stats", None)
+            split = column_stats(yesterday) if column_stats else None
+            if split:
+                stats, tasks = split
+            else:
+                stats, tasks = None, list(self.tasks)
+        if stats is None:
+            stats = {
+                "total": 0,
+                "completed": 0,
+                "by_priority": defaultdict(int),
+                "by_category": defaultdict(int),
+                "overdue": 0
+            }
+        stats["total"] += len(tasks)
+        stats["completed"] += sum(1 for t in tasks if t.completed)
         
-        for task in self.tasks:
+        for task in tasks:
             stats["by_priority"][task.priority] += 1
             
             if task.category:
                 stats["by_category"][task.category] += 1
                 
-            if task.due_date and not task.completed:
-                due_date = datetime.strptime(task.due_date, "%Y-%m-%d").date()
-                if due_date < today:
-                    stats["overdue"] += 1
+            # For recurring tasks due_date is the pending occurrence
+            if not task.completed and next(task.due_dates(end=yesterday), None) is not None:
+                stats["overdue"] += 1
         
         # Calculate completion percentage
         stats["completion_pct"] = (
@@ -152,35 +515,44 @@ class TodoList:
     
     def export_csv(self, filename="tasks_export.csv"):
         """Export tasks to CSV file"""
-        import csv
         with open(filename, "w", newline="") as f:
-            writer = csv.writer(f)
-            # Write header
-            writer.writerow(["Description", "Completed", "Priority", 
-                            "Due Date", "Category", "Tags"])
-            
-            # Write tasks
-            for task in self.tasks:
-                writer.writerow([
-                    task.description,
-                    "Yes" if task.completed else "No",
-                    task.priority,
-                    task.due_date or "",
-                    task.category,
-                    ", ".join(task.tags)
-                ])
+            self.write_csv(f)
         return filename
     
+    def write_csv(self, f):
+        """Write tasks as CSV to an open text stream"""
+        import csv
+        tasks = self.snapshot()
+        writer = csv.writer(f)
+        # Write header
+        writer.writerow(["Description", "Completed", "Priority", 
+                        "Due Date", "Category", "Tags"])
+        
+        # Write tasks
+        for task in tasks:
+            writer.writerow([
+                task.description,
+                "Yes" if task.completed else "No",
+                task.priority,
+                task.due_date or "",
+                task.category,
+                ", ".join(task.tags)
+            ])
+    
     def predict_completion_time(self, task_id):
         """Predict time to complete a task based on history"""
         # Get similar tasks from history
-        task = self.tasks[task_id]
-        similar_tasks = [t for t in self.tasks 
+        tasks = self.snapshot()
+        task = tasks[task_id]
+        similar_tasks = [t for t in tasks 
                          if t.category == task.category 
                          and t.priority == task.priority 
                          and t.completed]
+        # Archived tasks contribute through their precomputed totals
+        archived, archived_timed, archived_minutes = self.archive.stats()["groups"].get(
+            task.category, {}).get(task.priority, [0, 0, 0.0])
         
-        if not similar_tasks:
+        if not similar_tasks and not archived:
             return "Insufficient data for prediction"
         
         # Collect actual durations if available
@@ -191,8 +563,8 @@ class TodoList:
                 durations.append(duration)
         
         # If we have actual durations, use them
-        if durations:
-            avg_minutes = sum(durations) / len(durations)
+        if durations or archived_timed:
+            avg_minutes = (sum(durations) + archived_minutes) / (len(durations) + archived_timed)
         else:
             # Fallback to priority-based estimation
             avg_minutes = {"high": 30, "medium": 60, "low": 120}[task.priority]
@@ -212,8 +584,16 @@ class TodoList:
         # Group tasks by category and day of week
         category_patterns = defaultdict(lambda: defaultdict(int))
         day_patterns = defaultdict(int)
+        tasks = self.snapshot()
+        
+        # Start from the archive's precomputed counts
+        archive_stats = self.archive.stats()
+        day_patterns.update(archive_stats["days"])
+        for category, days in archive_stats["category_days"].items():
+            category_patterns[category].update(days)
+        total = len(tasks) + archive_stats["count"]
         
-        for task in self.tasks:
+        for task in tasks:
             if task.completed and task.due_date:
                 day = datetime.strptime(task.due_date, "%Y-%m-%d").strftime("%A")
                 day_patterns[day] += 1
@@ -226,7 +606,7 @@ class TodoList:
         category_report = {}
         for category, days in category_patterns.items():
             if len(days) >= 3:  # Need enough data
-                completion_rate = sum(days.values()) / len(self.tasks)
+                completion_rate = sum(days.values()) / total
                 consistency = statistics.stdev(list(days.values())) if len(days) > 1 else 0
                 category_report[category] = {
                     "completion_rate": completion_rate,
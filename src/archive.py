@@ -0,0 +1,127 @@
+import gzip
+import json
+import os
+import zlib
+from datetime import datetime
+from src.storage import Storage, atomic_file
+
+ARCHIVE_AFTER_DAYS = 30  # Default age (days since completion) before archiving
+
+
+def completed_before(task, cutoff):
+    """
+    Check whether a task was completed before cutoff (a datetime)
+
+    Uses the completion time, or the due date for tasks completed before
+    completion times were recorded; tasks with neither are never archived.
+    """
+    if not task.completed:
+        return False
+    if task.end_time:
+        return task.end_time < cutoff
+    return bool(task.due_date) and task.due_date < cutoff.date().isoformat()
+
+
+class Archive:
+    """Cold store for completed tasks moved out of the hot task list
+
+    Tasks are appended as JSON lines in a new gzip member per archiving run
+    (readers see the members as one stream), so nothing already written is
+    ever rewritten. Alongside it a small JSON file keeps running aggregates
+    that habit analysis and time prediction need, so they never have to
+    decompress the archive.
+
+    The archive is only written while the task file's lock is held (see
+    TodoList.archive_completed), so sessions sharing a file share its archive.
+    """
+
+    def __init__(self, filename):
+        """
+        :param filename: Archive file (the aggregates go to <filename>.stats.json)
+        """
+        self.filename = filename
+        self.stats_filename = filename + ".stats.json"
+        self._stats = None
+        self._stats_version = None
+
+    @classmethod
+    def for_storage(cls, storage):
+        """Archive stored next to a task file: tasks.json -> tasks.json.archive.jsonl.gz"""
+        return cls(storage.filename + ".archive.jsonl.gz")
+
+    @staticmethod
+    def empty_stats():
+        return {
+            "count": 0,
+            "days": {},           # weekday name -> completed tasks due that day
+            "category_days": {},  # category -> weekday name -> count
+            "groups": {}          # category -> priority -> [count, timed, minutes]
+        }
+
+    def stats(self):
+        """Aggregates over every archived task (re-read if another session changed them)"""
+        try:
+            st = os.stat(self.stats_filename)
+            version = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            return self.empty_stats()
+        if version != self._stats_version:
+            try:
+                with open(self.stats_filename) as f:
+                    self._stats = json.load(f)
+                self._stats_version = version
+            except (IOError, ValueError) as e:
+                print(f"Error loading archive statistics: {e}")
+                return self.empty_stats()
+        return self._stats
+
+    def append(self, tasks):
+        """
+        Add completed tasks to the archive and fold them into the aggregates
+
+        :param tasks: Task objects to archive
+        """
+        if not tasks:
+            return
+        stats = json.loads(json.dumps(self.stats()))  # Private copy to update
+        with gzip.open(self.filename, "at", encoding="utf-8") as f:
+            for task in tasks:
+                f.write(json.dumps(Storage.task_to_dict(task)) + "\n")
+                self._add_to_stats(stats, task)
+        self._write_stats(stats)
+
+    @staticmethod
+    def _add_to_stats(stats, task):
+        stats["count"] += 1
+        if task.due_date:
+            day = datetime.strptime(task.due_date, "%Y-%m-%d").strftime("%A")
+            stats["days"][day] = stats["days"].get(day, 0) + 1
+            days = stats["category_days"].setdefault(task.category, {})
+            days[day] = days.get(day, 0) + 1
+        group = stats["groups"].setdefault(task.category, {}).setdefault(task.priority, [0, 0, 0.0])
+        group[0] += 1
+        if task.start_time and task.end_time:
+            group[1] += 1
+            group[2] += (task.end_time - task.start_time).total_seconds() / 60
+
+    def _write_stats(self, stats):
+        """Atomically replace the aggregates file"""
+        with atomic_file(self.stats_filename, "w", ".archive-") as f:
+            json.dump(stats, f)
+        st = os.stat(self.stats_filename)
+        self._stats = stats
+        self._stats_version = (st.st_mtime_ns, st.st_size)
+
+    def tasks(self):
+        """Lazily yield archived tasks, oldest archiving run first"""
+        try:
+            f = gzip.open(self.filename, "rt", encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with f:
+            try:
+                for line in f:
+                    yield Storage.task_from_dict(json.loads(line))
+            except (EOFError, zlib.error, gzip.BadGzipFile, ValueError) as e:
+                # A run interrupted mid-write leaves a truncated last member
+                print(f"Error reading task archive: {e}")
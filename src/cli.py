@@ -3,6 +3,10 @@ from src.nlp_processor import NLPProcessor
 from src.voice_interface import VoiceAssistant
 from datetime import datetime
 from .app import TodoList
+from src.storage import Storage
+from src import instrumentation
+from src.reminders import ReminderScheduler
+import sys
 import threading
 
 class TodoCLI:
@@ -24,7 +28,7 @@ class TodoCLI:
     }
     
     def __init__(self):
-        self.todo = TodoList()
+        self.todo = TodoList(Storage(on_merge=self.report_merge))
         self.ai_assistant = AIAssistant()
         self.nlp_processor = NLPProcessor()
         self.voice_interface = VoiceAssistant(self.todo)
@@ -41,14 +45,23 @@ class TodoCLI:
         }
         self.commands["0"] = ("AI Assistant", self.ai_assistant_mode) #under construction
         self.commands["v"] = ("Voice Control", self.toggle_voice) #under construction
+        self.commands["p"] = ("Performance Stats", self.show_performance)
+        self.commands["u"] = ("Undo", self.undo)
+        self.commands["r"] = ("Redo", self.redo)
         self.voice_active = False
         self.voice_lock = threading.Lock()
+        self.reminders = ReminderScheduler(self.todo, self.remind)
 
     
     def color_text(self, text, color):
         """Apply color to text if supported"""
         return f"{self.COLORS.get(color, '')}{text}{self.COLORS['reset']}" if self.COLORS else text
 
+    def report_merge(self, conflicts):
+        """Tell the user a save merged in another session's changes"""
+        note = f", {conflicts} conflicting field(s) kept local values" if conflicts else ""
+        print(self.color_text(f"Merged changes saved by another session{note}", "yellow"), file=sys.stderr)
+
     def display_menu(self):
         """Show enhanced main menu"""
         with self.voice_lock:
@@ -64,29 +77,34 @@ class TodoCLI:
         description = input("Enter task: ").strip()
         
         # Try natural language processing
-        if " " in description and any(word in description.lower() for word in ["tomorrow", "today", "at", "on", "next"]):
+        if " " in description and any(word in description.lower() for word in ["tomorrow", "today", "at", "on", "next",
+                                                                              "every"]):
             try:
                 details = self.nlp_processor.parse_command(description)
                 description = details["description"]
                 due_date = details["due_date"]
                 priority = details["priority"]
+                recurrence = details["recurrence"]
                 
                 # Auto-categorize with AI
                 category = self.ai_assistant.auto_categorize(description)
                 
-                self.todo.add_task(
+                task = self.todo.add_task(
                     description, 
                     due_date=due_date,
                     priority=priority,
-                    category=category
+                    category=category,
+                    recurrence=recurrence
                 )
                 
                 # Show prediction
-                prediction = self.todo.predict_completion_time(len(self.todo.tasks)-1)
+                prediction = self.todo.predict_completion_time(self.todo.index_of(task.uid))
                 
                 print(self.color_text(f"✓ Added: {description}", "green"))
                 print(self.color_text(f"  Due: {due_date or 'No deadline'}", "blue"))
                 print(self.color_text(f"  Priority: {priority}", "yellow"))
+                if recurrence:
+                    print(self.color_text(f"  Repeats: {recurrence.describe()}", "blue"))
                 print(self.color_text(f"  Category: {category}", "cyan"))
                 print(self.color_text(f"  Predicted time: {prediction}", "magenta"))
                 return
@@ -159,24 +177,37 @@ class TodoCLI:
                 print(self.color_text("Invalid number!", "red"))
                 return
         
+        include_archived = input("Include archived tasks? (y/n): ").lower() == "y"
+        
         # Perform search
         results = self.todo.search_tasks(
             search_term=search_term,
             category=category,
             tags=tags,
             priority=priority,
-            due_within=due_within
+            due_within=due_within,
+            include_archived=include_archived
         )
         
+        # IDs shown are list positions, as in View Tasks (archived tasks have none)
+        positions = {t.uid: i for i, t in enumerate(self.todo.snapshot())}
+        
         # Display results
         if not results:
             print(self.color_text("\nNo tasks match your criteria", "yellow"))
+            if search_term:
+                # Maybe a typo: offer the closest descriptions instead
+                matches = self.todo.fuzzy_search(search_term)
+                if matches:
+                    print(self.color_text("Did you mean:", "blue"))
+                    for task, score in matches:
+                        print(f"{positions.get(task.uid, '-')}. {task.description} ({score:.0%} match)")
             return
             
         print(self.color_text(f"\nFound {len(results)} tasks:", "green"))
-        for i, task in enumerate(results):
+        for task in results:
             status = "✓" if task.completed else "◻"
-            print(f"{i}. [{status}] {task.description} ({task.category})")
+            print(f"{positions.get(task.uid, '-')}. [{status}] {task.description} ({task.category})")
             if task.tags:
                 tags_display = ", ".join(task.tags)
                 print(f"   Tags: {tags_display}")
@@ -185,7 +216,9 @@ class TodoCLI:
     
     def view_tasks(self):
         """Display tasks with all attributes"""
-        tasks = self.todo.view_tasks(sort_by="due_date")
+        tasks = self.todo.view_page(sort_by="due_date")
+        # IDs shown are list positions, which sorting no longer changes
+        positions = {t.uid: i for i, t in enumerate(self.todo.snapshot())}
         
         if not tasks:
             print(self.color_text("No tasks found!", "yellow"))
@@ -196,7 +229,8 @@ class TodoCLI:
         print(f"{'ID':<3} | {'Status':<6} | {'Priority':<8} | {'Due':<12} | {'Category':<15} | Description")
         print("-" * 70)
         
-        for i, task in enumerate(tasks):
+        for task in tasks:
+            i = positions.get(task.uid, "?")
             # Status indicator
             status = self.color_text("✓ DONE", "green") if task.completed else self.color_text("TODO", "red")
             
@@ -220,6 +254,8 @@ class TodoCLI:
             if task.tags:
                 tags_display = ", ".join(task.tags)
                 print(f"   Tags: {tags_display}")
+            if task.recurrence:
+                print(f"   Repeats: {task.recurrence.describe()}")
     
     def show_stats(self):
         """Display productivity statistics"""
@@ -263,15 +299,23 @@ class TodoCLI:
                 print(f"  Completion: {data['completion_rate']*100:.1f}%")
                 print(f"  Peak day: {data['peak_day']}")
 
+    def show_performance(self):
+        """Display latency and size metrics collected for hot paths"""
+        print("\n" + self.color_text("=== PERFORMANCE STATISTICS ===", "blue"))
+        if not instrumentation.enabled:
+            print(self.color_text("Instrumentation is off. Start with --profile or TODO_METRICS=1", "yellow"))
+            return
+        print(instrumentation.report())
+
     def edit_task(self):
         """Edit task with extended attributes"""
         self.view_tasks()
-        if not self.todo.tasks:
+        if not self.todo.count_tasks():
             return
             
         try:
             task_id = int(input("Enter task ID to edit: "))
-            task = self.todo.tasks[task_id]
+            task = self.todo.get_task(task_id)
             
             # Edit description
             new_desc = input(f"New description [{task.description}]: ").strip()
@@ -311,14 +355,17 @@ class TodoCLI:
     def toggle_completed(self):
         """Toggle task completion status"""
         self.view_tasks()
-        if not self.todo.tasks:
+        if not self.todo.count_tasks():
             return
             
         try:
             task_id = int(input("Enter task ID to toggle: "))
-            task = self.todo.tasks[task_id]
+            task = self.todo.get_task(task_id)
             new_status = not task.completed
-            self.todo.edit_task(task_id, completed=new_status)
+            task = self.todo.edit_task(task_id, completed=new_status)
+            if new_status and not task.completed:
+                print(self.color_text(f"✓ Occurrence done! Next due: {task.due_date}", "green"))
+                return
             status = "completed" if new_status else "marked as incomplete"
             print(self.color_text(f"✓ Task {status}!", "green"))
         except (ValueError, IndexError):
@@ -332,7 +379,7 @@ class TodoCLI:
             
         try:
             export_path = self.todo.export_csv(filename)
-            print(self.color_text(f"✓ Exported {len(self.todo.tasks)} tasks to {export_path}", "green"))
+            print(self.color_text(f"✓ Exported {self.todo.count_tasks()} tasks to {export_path}", "green"))
         except Exception as e:
             print(self.color_text(f"Export failed: {str(e)}", "red"))
 
@@ -360,7 +407,7 @@ class TodoCLI:
         #            self.voice_interface.start()
         #            self.voice_active = True
         #            print(self.color_text("Voice control activated! Try saying 'Add a task'", "green"))
-        #            print(self.color_text("Supported commands: 'Add [task]', 'Complete [task number]', 'What are my tasks?', 'Exit'", "blue"))
+        #            print(self.color_text("Supported commands: 'Add [task]', 'Complete [task number or name]', 'Delete [task name]', 'What are my tasks?', 'Undo', 'Redo', 'Exit'", "blue"))
         #        except Exception as e:
         #            print(self.color_text(f"Failed to activate voice: {str(e)}", "red"))
         #            self.voice_active = False
@@ -373,6 +420,40 @@ class TodoCLI:
         #            print(self.color_text(f"Failed to deactivate voice: {str(e)}", "red"))
         #            self.voice_active = True
     
+    def undo(self):
+        """Revert the last change"""
+        try:
+            task = self.todo.undo()
+        except IndexError as e:
+            print(self.color_text(str(e), "red"))
+            return
+        if task is None:
+            print(self.color_text("Nothing to undo", "yellow"))
+        else:
+            print(self.color_text(f"Undone (task: {task.description})", "green"))
+    
+    def redo(self):
+        """Re-apply the last undone change"""
+        try:
+            task = self.todo.redo()
+        except IndexError as e:
+            print(self.color_text(str(e), "red"))
+            return
+        if task is None:
+            print(self.color_text("Nothing to redo", "yellow"))
+        else:
+            print(self.color_text(f"Redone (task: {task.description})", "green"))
+    
+    def remind(self, task):
+        """Announce a task that just came due (runs on the reminder thread)"""
+        when = "today" if task.due_date == datetime.today().date().isoformat() else task.due_date
+        print("\n" + self.color_text(f"⏰ Reminder: {task.description} is due {when}",
+                                      self.PRIORITY_COLORS[task.priority]))
+        with self.voice_lock:
+            voice_active = self.voice_active
+        if voice_active:
+            self.voice_interface.speak(f"Reminder: {task.description} is due {when}")
+    
     def delete_task(self):
         """Handle task deletion"""
         self.view_tasks()
@@ -390,8 +471,11 @@ class TodoCLI:
     
     def run(self):
         """Main application loop ( enhanced error handling )"""
+        self.reminders.start()
         while True:
             try:
+                # Pick up changes saved by other sessions sharing the file
+                self.todo.reload_if_changed()
                 self.display_menu()
                 choice = input("Enter choice: ").strip()
                 
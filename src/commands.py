@@ -0,0 +1,356 @@
+"""Non-interactive subcommands for scripting the to-do list.
+
+    python main.py add "Write report" --priority high --due 2025-07-01
+    python main.py --json list --pending --sort due_date
+    python main.py done 3
+    python main.py --stdin < commands.txt
+
+Only the subsystems a command needs are imported: natural-language parsing
+and AI categorisation load only for ``add --parse`` / ``add --auto-category``,
+and voice never loads. With ``--stdin`` every line is one command (same syntax
+as the command line, minus the global flags) and the whole batch shares a
+single load and a single save.
+"""
+import argparse
+import json
+import shlex
+import sys
+import threading
+from datetime import datetime, time
+from src.app import TodoList
+from src.archive import ARCHIVE_AFTER_DAYS
+from src.storage import Storage
+from src.recurrence import RecurrenceRule
+
+
+def build_parser():
+    """Argument parser for the global flags and every subcommand"""
+    parser = argparse.ArgumentParser(prog="main.py", description="Scriptable to-do list manager")
+    parser.add_argument("--file", default="tasks.json", help="Task file (default: tasks.json)")
+    parser.add_argument("--json", action="store_true", help="Machine-readable JSON output")
+    parser.add_argument("--stdin", action="store_true",
+                        help="Read one command per line from stdin and apply them in one save")
+    parser.add_argument("--archive-after", type=int, default=ARCHIVE_AFTER_DAYS, metavar="DAYS",
+                        help=f"Archive tasks completed more than DAYS ago (default: {ARCHIVE_AFTER_DAYS})")
+    subparsers = parser.add_subparsers(dest="command", parser_class=CommandParser)
+    add_command_parsers(subparsers)
+    return parser
+
+
+def add_command_parsers(subparsers):
+    add = subparsers.add_parser("add", help="Add a task")
+    add.add_argument("description")
+    add.add_argument("--priority", choices=["low", "medium", "high"])
+    add.add_argument("--due", type=parse_date, help="Due date (YYYY-MM-DD)")
+    add.add_argument("--category")
+    add.add_argument("--tags", type=parse_tags, help="Comma separated tags")
+    add.add_argument("--repeat", type=parse_repeat, metavar="PHRASE",
+                     help='Recurrence, e.g. "every weekday" or "first Monday monthly"')
+    add.add_argument("--parse", action="store_true",
+                     help="Extract due date and priority from the description")
+    add.add_argument("--auto-category", action="store_true",
+                     help="Let the AI assistant pick a category")
+
+    listing = subparsers.add_parser("list", help="List tasks")
+    status = listing.add_mutually_exclusive_group()
+    status.add_argument("--pending", action="store_true")
+    status.add_argument("--completed", action="store_true")
+    listing.add_argument("--sort", default="added",
+                         choices=["priority", "due_date", "category", "priority_due", "due_priority", "added"])
+    listing.add_argument("--limit", type=int)
+
+    search = subparsers.add_parser("search", help="Search tasks")
+    search.add_argument("term", nargs="?", default="")
+    search.add_argument("--category")
+    search.add_argument("--tags", type=parse_tags)
+    search.add_argument("--priority", choices=["low", "medium", "high"])
+    search.add_argument("--due-within", type=int, metavar="DAYS")
+    search.add_argument("--archived", action="store_true", help="Include archived tasks")
+    search.add_argument("--fuzzy", action="store_true",
+                        help="Rank descriptions by similarity to TERM, tolerating typos")
+
+    done = subparsers.add_parser("done", help="Mark a task completed")
+    done.add_argument("task", help="Task ID (list position) or uid")
+    done.add_argument("--undo", action="store_true", help="Mark as incomplete instead")
+
+    subparsers.add_parser("stats", help="Show productivity statistics")
+    subparsers.add_parser("undo", help="Revert the last change")
+    subparsers.add_parser("redo", help="Re-apply the last undone change")
+
+    export = subparsers.add_parser("export", help="Export tasks")
+    export.add_argument("--output", "-o", help="File to write (default: stdout)")
+    export.add_argument("--format", choices=["csv", "json"], default="csv")
+
+    serve = subparsers.add_parser("serve", help="Run the HTTP/JSON API server")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+
+    remind = subparsers.add_parser("remind", help="Print reminders as tasks come due (Ctrl+C stops)")
+    remind.add_argument("--at", type=parse_time, default=time(9, 0), metavar="HH:MM",
+                        help="Time of day reminders fire on the due date (default: 09:00)")
+
+
+class CommandParser(argparse.ArgumentParser):
+    """Subcommand parser that raises instead of exiting, so one bad batch line
+    doesn't abort the rest"""
+
+    def error(self, message):
+        raise ValueError(f"{self.prog}: {message}")
+
+
+def parse_date(value):
+    datetime.strptime(value, "%Y-%m-%d")
+    return value
+
+
+def parse_time(value):
+    return time.fromisoformat(value)
+
+
+def parse_repeat(value):
+    rule, _ = RecurrenceRule.from_text(value)
+    if rule is None:
+        raise ValueError(f"unrecognized recurrence: {value}")
+    return rule
+
+
+def parse_tags(value):
+    return [tag.strip() for tag in value.split(",") if tag.strip()]
+
+
+def resolve_task(todo, ref):
+    """Turn a list position or uid into a list position"""
+    if ref.lstrip("-").isdigit():
+        return int(ref)
+    return todo.index_of(ref)
+
+
+def task_records(todo, tasks):
+    """Serialize tasks, tagging each with its current list position"""
+    positions = {t.uid: i for i, t in enumerate(todo.snapshot())}
+    records = []
+    for task in tasks:
+        record = Storage.task_to_dict(task)
+        record["id"] = positions.get(task.uid)
+        records.append(record)
+    return records
+
+
+def format_task(record):
+    status = "✓" if record["completed"] else "◻"
+    details = [record["priority"], record["category"]]
+    if record["due_date"]:
+        details.append(f"due {record['due_date']}")
+    if record["recurrence"]:
+        details.append(RecurrenceRule.from_dict(record["recurrence"]).describe())
+    ref = "(archived)" if record["id"] is None else f"{record['id']}."
+    return f"{ref} [{status}] {record['description']} ({', '.join(details)})"
+
+
+# --- Command handlers: return (result for JSON, text lines) ---
+
+def cmd_add(todo, args):
+    description = args.description
+    fields = {"priority": args.priority, "due_date": args.due,
+              "category": args.category, "tags": args.tags, "recurrence": args.repeat}
+    if args.parse:
+        from src.nlp_processor import NLPProcessor
+        details = NLPProcessor().parse_command(description)
+        description = details["description"]
+        fields["due_date"] = fields["due_date"] or details["due_date"]
+        fields["priority"] = fields["priority"] or details["priority"]
+        fields["recurrence"] = fields["recurrence"] or details["recurrence"]
+    if fields["recurrence"] and not fields["due_date"]:
+        fields["due_date"] = fields["recurrence"].start.isoformat()
+    if args.auto_category and not fields["category"]:
+        from src.ai_assistant import AIAssistant
+        fields["category"] = AIAssistant().auto_categorize(description)
+    task = todo.add_task(description, **{k: v for k, v in fields.items() if v is not None})
+    record, = task_records(todo, [task])
+    return record, [f"Added: {format_task(record)}"]
+
+
+def cmd_list(todo, args):
+    completed = True if args.completed else False if args.pending else None
+    tasks = todo.view_page(filter_completed=completed, sort_by=args.sort, limit=args.limit)
+    records = task_records(todo, tasks)
+    return records, [format_task(r) for r in records] or ["No tasks found"]
+
+
+def cmd_search(todo, args):
+    if args.fuzzy:
+        records = task_records(todo, [task for task, _ in todo.fuzzy_search(args.term, limit=10)])
+        return records, [format_task(r) for r in records] or ["No similar tasks found"]
+    results = todo.search_tasks(search_term=args.term, category=args.category, tags=args.tags,
+                                priority=args.priority, due_within=args.due_within,
+                                include_archived=args.archived)
+    records = task_records(todo, results)
+    return records, [format_task(r) for r in records] or ["No tasks match your criteria"]
+
+
+def cmd_done(todo, args):
+    task = todo.mark_completed(resolve_task(todo, args.task), completed=not args.undo)
+    record, = task_records(todo, [task])
+    return record, [("Reopened: " if args.undo else "Completed: ") + format_task(record)]
+
+
+def cmd_undo(todo, args):
+    return replay(todo, todo.undo, "Undone", "Nothing to undo")
+
+
+def cmd_redo(todo, args):
+    return replay(todo, todo.redo, "Redone", "Nothing to redo")
+
+
+def replay(todo, step, done, nothing):
+    task = step()
+    if task is None:
+        return None, [nothing]
+    record, = task_records(todo, [task])
+    return record, [f"{done}: {task.description}"]
+
+
+def cmd_stats(todo, args):
+    stats = todo.get_stats()
+    lines = [
+        f"Total tasks: {stats['total']}",
+        f"Completed: {stats['completed']} ({stats['completion_pct']:.1f}%)",
+        f"Overdue: {stats['overdue']}"
+    ]
+    lines += [f"Priority {p}: {n}" for p, n in stats["by_priority"].items()]
+    lines += [f"Category {c}: {n}" for c, n in stats["by_category"].items()]
+    return stats, lines
+
+
+def cmd_export(todo, args):
+    if args.format == "json":
+        text = json.dumps([Storage.task_to_dict(t) for t in todo.snapshot()], indent=2) + "\n"
+    else:
+        import io
+        buffer = io.StringIO()
+        todo.write_csv(buffer)
+        text = buffer.getvalue()
+    if not args.output:
+        sys.stdout.write(text)
+        return None, []
+    with open(args.output, "w", newline="") as f:
+        f.write(text)
+    return {"output": args.output}, [f"Exported to {args.output}"]
+
+
+COMMANDS = {
+    "add": cmd_add,
+    "list": cmd_list,
+    "search": cmd_search,
+    "done": cmd_done,
+    "stats": cmd_stats,
+    "undo": cmd_undo,
+    "redo": cmd_redo,
+    "export": cmd_export,
+}
+# The batch is recorded as one undo step only when it ends, so undo/redo
+# inside it would replay whatever came before the batch
+NOT_IN_BATCH = {"undo", "redo"}
+
+
+def execute(todo, args, as_json):
+    """Run one parsed command and print its output; returns True on success"""
+    try:
+        result, lines = COMMANDS[args.command](todo, args)
+    except (ValueError, IndexError, OSError) as e:
+        if as_json:
+            print(json.dumps({"command": args.command, "error": str(e)}))
+        else:
+            print(f"Error: {e}", file=sys.stderr)
+        return False
+    if as_json:
+        if result is not None:
+            print(json.dumps(result))
+    else:
+        for line in lines:
+            print(line)
+    return True
+
+
+def run_batch(todo, lines, as_json):
+    """Apply commands read from lines within a single load/save cycle"""
+    command_parser = CommandParser(prog="batch")
+    add_command_parsers(command_parser.add_subparsers(dest="command", required=True,
+                                                      parser_class=CommandParser))
+    ok = True
+    with todo.batch():
+        for number, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                args = command_parser.parse_args(shlex.split(line))
+                if args.command not in COMMANDS or args.command in NOT_IN_BATCH:
+                    raise ValueError(f"'{args.command}' is not available in batch mode")
+            except ValueError as e:
+                ok = False
+                if as_json:
+                    print(json.dumps({"line": number, "error": str(e)}))
+                else:
+                    print(f"Line {number}: {e}", file=sys.stderr)
+                continue
+            ok = execute(todo, args, as_json) and ok
+    return ok
+
+
+def report_merge(conflicts):
+    """Note on stderr that a save merged in another session's changes"""
+    note = f", {conflicts} conflicting field(s) kept local values" if conflicts else ""
+    print(f"Merged changes saved by another session{note}", file=sys.stderr)
+
+
+def run_reminders(todo, remind_at, as_json, reload_interval=10):
+    """Print reminders until interrupted, following edits from other sessions"""
+    from src.reminders import ReminderScheduler
+
+    def notify(task):
+        if as_json:
+            print(json.dumps(Storage.task_to_dict(task)), flush=True)
+        else:
+            print(f"Reminder: {task.description} is due {task.due_date}", flush=True)
+
+    scheduler = ReminderScheduler(todo, notify, remind_at=remind_at)
+    scheduler.start()
+    print(f"Watching {len(scheduler)} upcoming reminder(s); Ctrl+C to stop", file=sys.stderr)
+    try:
+        idle = threading.Event()
+        while not idle.wait(reload_interval):
+            todo.reload_if_changed()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        scheduler.stop()
+    return 0
+
+
+def main(argv=None):
+    """Entry point for scripted use; returns the process exit status"""
+    parser = build_parser()
+    try:
+        args = parser.parse_args(argv)
+    except ValueError as e:
+        parser.print_usage(sys.stderr)
+        print(e, file=sys.stderr)
+        return 2
+
+    if args.command == "serve":
+        from src import server
+        server.main(["--host", args.host, "--port", str(args.port), "--file", args.file])
+        return 0
+
+    if not args.stdin and not args.command:
+        parser.print_help()
+        return 2
+
+    todo = TodoList(Storage.for_file(args.file, on_merge=report_merge),
+                    archive_after_days=args.archive_after)
+    if args.command == "remind":
+        return run_reminders(todo, args.at, args.json)
+    if args.stdin:
+        return 0 if run_batch(todo, sys.stdin, args.json) else 1
+    return 0 if execute(todo, args, args.json) else 1
@@ -0,0 +1,121 @@
+import heapq
+import re
+import threading
+from collections import Counter, defaultdict
+
+WORD = re.compile(r"[^\W_]+")
+
+
+def trigrams(text):
+    """Character trigrams of each word, padded so word starts and ends count"""
+    grams = set()
+    for word in WORD.findall(text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+class TrigramIndex:
+    """Typo-tolerant lookup of tasks by description
+
+    Maps every character trigram to the uids of the tasks containing it.
+    A query only scores tasks that share one of its rarer trigrams, so a
+    lookup touches the likely matches rather than the whole list. The score
+    averages Dice similarity of the trigram sets (how alike the two are
+    overall) with the share of the query's trigrams the task contains, so a
+    short query still finds a long description it is part of.
+
+    Attach to a TodoList with follow() to keep the index current through
+    its change events.
+    """
+
+    COMMON = 0.05  # Trigrams in more than this share of tasks don't nominate candidates...
+    MIN_NOMINATING = 3  # ...unless they are among the query's rarest
+
+    def __init__(self):
+        self._postings = defaultdict(set)  # trigram -> uids
+        self._grams = {}                   # uid -> trigrams of its description
+        self._tasks = {}                   # uid -> latest task version
+        self._lock = threading.Lock()
+        self.todo = None
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def _add(self, task):
+        grams = trigrams(task.description)
+        self._grams[task.uid] = grams
+        self._tasks[task.uid] = task
+        for gram in grams:
+            self._postings[gram].add(task.uid)
+
+    def _remove(self, uid):
+        self._tasks.pop(uid, None)
+        for gram in self._grams.pop(uid, ()):
+            uids = self._postings[gram]
+            uids.discard(uid)
+            if not uids:
+                del self._postings[gram]
+
+    def rebuild(self, tasks):
+        with self._lock:
+            self._postings = defaultdict(set)
+            self._grams = {}
+            self._tasks = {}
+            for task in tasks:
+                self._add(task)
+
+    def follow(self, todo):
+        """Index a TodoList and keep the index current as it changes"""
+        self.todo = todo
+        todo.subscribe(self.on_change)
+        self.rebuild(todo.snapshot())
+
+    def on_change(self, event, old, new):
+        """TodoList listener: update only the changed task"""
+        if event == "reset":
+            # Runs under the list's write lock, so reading tasks directly is safe
+            self.rebuild(self.todo.tasks)
+            return
+        with self._lock:
+            if old is not None and (new is None or old.description != new.description):
+                self._remove(old.uid)
+            if new is not None:
+                if old is not None and old.description == new.description:
+                    self._tasks[new.uid] = new  # Same words, newer version
+                else:
+                    self._add(new)
+
+    def search(self, query, limit=5, min_score=0.3):
+        """
+        Rank tasks by similarity to a possibly misspelled query
+
+        :param query: Text to look for
+        :param limit: Maximum number of results
+        :param min_score: Score (0-1) a task needs to be returned
+        :return: [(task, score)] best first
+        """
+        wanted = trigrams(query)
+        if not wanted:
+            return []
+        with self._lock:
+            postings = sorted((self._postings[gram] for gram in wanted if gram in self._postings), key=len)
+            common = max(1, int(len(self._tasks) * self.COMMON))
+            # Rare trigrams nominate candidates, plus the few rarest ones in
+            # case a typo left the query with only common trigrams
+            nominating = [uids for rank, uids in enumerate(postings)
+                          if rank < self.MIN_NOMINATING or len(uids) <= common]
+            shared = Counter()
+            for uids in nominating:
+                shared.update(uids)
+
+            scored = []
+            for uid in shared:
+                grams = self._grams[uid]
+                common_grams = len(wanted & grams)
+                dice = 2 * common_grams / (len(wanted) + len(grams))
+                score = (dice + common_grams / len(wanted)) / 2
+                if score >= min_score:
+                    scored.append((score, uid))
+            best = heapq.nlargest(limit, scored)
+            return [(self._tasks[uid], score) for score, uid in best]
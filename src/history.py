@@ -0,0 +1,134 @@
+import json
+import os
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from src.storage import Storage, atomic_file
+
+HISTORY_LIMIT = 100  # Undo steps kept (and persisted)
+
+
+class History:
+    """Bounded undo/redo stacks of inverse operations
+
+    Each step stores only what is needed to reverse one change, never a copy
+    of the list:
+
+        {"op": "delete", "uid": ...}                    undoes an add
+        {"op": "insert", "index": i, "task": {...}}     undoes a delete
+        {"op": "update", "uid": ..., "fields": {...}}   undoes an edit (old values
+                                                         of the changed fields only)
+        {"op": "group", "ops": [...]}                   undoes a batch
+
+    Applying a step (TodoList.undo/redo) yields the step that reverses it,
+    which goes on the opposite stack. Both stacks are saved to a small JSON
+    file after every change so undo survives a restart.
+
+    Sessions sharing a task file share its history, like one document edited
+    in several windows: undo reverts the most recent change from any of
+    them. Every change to the stacks happens in updating(), which holds the
+    task file's lock and first re-reads the file if another session wrote
+    it, so no session's steps are lost.
+    """
+
+    def __init__(self, filename=None, limit=HISTORY_LIMIT, lock=None):
+        """
+        :param filename: JSON file to persist to (None: memory only)
+        :param limit: Maximum number of undo (and redo) steps
+        :param lock: Returns the inter-process lock to hold while updating
+                     the file (e.g. Storage.lock)
+        """
+        self.filename = filename
+        self.limit = limit
+        self.undo_stack = deque(maxlen=limit)
+        self.redo_stack = deque(maxlen=limit)
+        self._group = None
+        self._lock = lock or nullcontext
+        self._version = None  # File version as of our last load/save
+        self.load()
+
+    @classmethod
+    def for_storage(cls, storage, limit=HISTORY_LIMIT):
+        """History stored next to a task file: tasks.json -> tasks.json.history.json"""
+        return cls(storage.filename + ".history.json", limit, storage.lock)
+
+    # --- Recording (called by TodoList with its write lock held) ---
+
+    def record_add(self, task):
+        self._record({"op": "delete", "uid": task.uid})
+
+    def record_delete(self, index, task):
+        self._record({"op": "insert", "index": index, "task": Storage.task_to_dict(task)})
+
+    def record_edit(self, old, new):
+        before = Storage.task_to_dict(old)
+        after = Storage.task_to_dict(new)
+        fields = {name: value for name, value in before.items() if after[name] != value}
+        if fields:
+            self._record({"op": "update", "uid": old.uid, "fields": fields})
+
+    def _record(self, step):
+        if self._group is not None:
+            self._group.append(step)
+            return
+        with self.updating():
+            self.undo_stack.append(step)
+            self.redo_stack.clear()
+
+    def begin_group(self):
+        """Collect steps into one undoable group until end_group"""
+        self._group = []
+
+    def end_group(self):
+        group, self._group = self._group, None
+        if len(group) == 1:
+            self._record(group[0])
+        elif group:
+            self._record({"op": "group", "ops": group})
+
+    # --- Persistence ---
+
+    @contextmanager
+    def updating(self):
+        """Hold the file lock with the stacks current, saving them at the end"""
+        with self._lock():
+            if self._current_version() != self._version:
+                self.load()
+            try:
+                yield
+            finally:
+                self.save()
+
+    def _current_version(self):
+        if not self.filename:
+            return None
+        try:
+            st = os.stat(self.filename)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def load(self):
+        if not self.filename:
+            return
+        try:
+            with open(self.filename) as f:
+                st = os.fstat(f.fileno())
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (IOError, ValueError) as e:
+            print(f"Error loading undo history: {e}")
+            return
+        self.undo_stack = deque(data.get("undo", []), maxlen=self.limit)
+        self.redo_stack = deque(data.get("redo", []), maxlen=self.limit)
+        self._version = (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def save(self):
+        if not self.filename:
+            return
+        try:
+            with atomic_file(self.filename, "w", ".history-") as f:
+                json.dump({"undo": list(self.undo_stack), "redo": list(self.redo_stack)}, f)
+            self._version = self._current_version()
+        except IOError as e:
+            print(f"Error saving undo history: {e}")
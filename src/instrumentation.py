@@ -0,0 +1,205 @@
+"""Lightweight timers, counters and histograms for the app's hot paths.
+
+Hot paths are marked with ``@timed("storage.save")``. While instrumentation
+is disabled (the default) marking costs nothing: the decorator returns the
+function unchanged. ``enable()`` swaps timing wrappers onto the owning
+classes and ``disable()`` puts the originals back, so the only permanent
+cost is the ``if instrumentation.enabled`` guard around the few explicit
+``record``/``count`` calls.
+
+Start the app with ``--profile`` (cProfile + tracemalloc for the whole
+session) or with ``TODO_METRICS=1`` in the environment to collect metrics;
+the CLI's "Performance Stats" menu entry prints them.
+"""
+import cProfile
+import functools
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+enabled = False
+
+_marked = []   # Functions decorated with @timed
+_active = {}   # Original function -> installed wrapper
+_lock = threading.Lock()
+timers = {}
+values = {}
+counters = {}
+
+
+class Histogram:
+    """Running count/total/min/max plus recent samples for percentiles"""
+
+    def __init__(self, max_samples=10000):
+        """
+        :param max_samples: Recent observations kept for percentile estimates
+        """
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.samples = deque(maxlen=max_samples)
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self.samples.append(value)
+
+    def percentile(self, pct):
+        """Nearest-rank percentile over the retained samples"""
+        ordered = sorted(self.samples)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _histogram(table, name):
+    histogram = table.get(name)
+    if histogram is None:
+        with _lock:
+            histogram = table.setdefault(name, Histogram())
+    return histogram
+
+
+def record(name, value):
+    """Add a value (e.g. bytes written) to a named histogram"""
+    if enabled:
+        _histogram(values, name).observe(value)
+
+
+def count(name, n=1):
+    """Increment a named counter"""
+    if enabled:
+        with _lock:
+            counters[name] = counters.get(name, 0) + n
+
+
+def _wrap(func, name):
+    timer = _histogram(timers, name)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            count(name + ".errors")
+            raise
+        finally:
+            timer.observe(time.perf_counter() - start)
+    return wrapper
+
+
+def timed(name):
+    """Mark a function or method as a hot path timed under the given name"""
+    def decorate(func):
+        func.__timed_name__ = name
+        _marked.append(func)
+        if enabled:
+            # Enabled before this module was imported: wrap before the class exists
+            _active[func] = _wrap(func, name)
+            return _active[func]
+        return func
+    return decorate
+
+
+def _owner(func):
+    """Class (or module) the function was defined on, and its attribute name"""
+    owner = sys.modules[func.__module__]
+    *path, attr = func.__qualname__.split(".")
+    for part in path:
+        owner = getattr(owner, part)
+    return owner, attr
+
+
+def enable():
+    """Install timing wrappers on every marked hot path"""
+    global enabled
+    enabled = True
+    for func in _marked:
+        if func not in _active:
+            owner, attr = _owner(func)
+            _active[func] = _wrap(func, func.__timed_name__)
+            setattr(owner, attr, _active[func])
+
+
+def disable():
+    """Restore the original, unwrapped hot paths"""
+    global enabled
+    enabled = False
+    for func, wrapper in list(_active.items()):
+        owner, attr = _owner(func)
+        if getattr(owner, attr, None) is wrapper:
+            setattr(owner, attr, func)
+        del _active[func]
+
+
+def reset():
+    """Forget all collected metrics"""
+    with _lock:
+        timers.clear()
+        values.clear()
+        counters.clear()
+
+
+def report():
+    """Format collected metrics as a table"""
+    used_timers = {name: h for name, h in timers.items() if h.count}
+    if not (used_timers or values or counters):
+        return "No metrics collected yet"
+    lines = [f"{'Operation':<24} {'Calls':>7} {'p50 ms':>9} {'p95 ms':>9} {'Max ms':>9}"]
+    for name, h in sorted(used_timers.items()):
+        lines.append(f"{name:<24} {h.count:>7} {h.percentile(50) * 1000:>9.2f} "
+                     f"{h.percentile(95) * 1000:>9.2f} {(h.max or 0) * 1000:>9.2f}")
+    if values:
+        lines.append("")
+        lines.append(f"{'Value':<24} {'Count':>7} {'p50':>9} {'p95':>9} {'Total':>12}")
+        for name, h in sorted(values.items()):
+            lines.append(f"{name:<24} {h.count:>7} {h.percentile(50):>9.0f} "
+                         f"{h.percentile(95):>9.0f} {h.total:>12.0f}")
+    if counters:
+        lines.append("")
+        lines += [f"{name:<24} {n:>7}" for name, n in sorted(counters.items())]
+    return "\n".join(lines)
+
+
+@contextmanager
+def profile_session(output="todo.prof", top=20, stream=None):
+    """
+    Run a block under cProfile and tracemalloc with metrics enabled
+
+    On exit prints the hottest functions, peak memory, the biggest allocation
+    sites and the metrics table, and dumps raw profile data to output.
+    """
+    stream = stream or sys.stderr
+    enable()
+    tracemalloc.start()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        buffer = io.StringIO()
+        pstats.Stats(profiler, stream=buffer).sort_stats("cumulative").print_stats(top)
+        print("\n=== PROFILE (cumulative) ===", file=stream)
+        print(buffer.getvalue(), file=stream)
+        print(f"=== MEMORY: current {current / 1024:.1f} KiB, peak {peak / 1024:.1f} KiB ===", file=stream)
+        for stat in snapshot.statistics("lineno")[:10]:
+            print(stat, file=stream)
+        print("\n=== METRICS ===", file=stream)
+        print(report(), file=stream)
+        if output:
+            profiler.dump_stats(output)
+            print(f"\nRaw profile written to {output}", file=stream)
@@ -1,18 +1,26 @@
 from functools import lru_cache
 from dateparser import parse
+from src.recurrence import RecurrenceRule
+from src import instrumentation
 import re
 
 class NLPProcessor:
     """Parse natural language task inputs"""
+    @instrumentation.timed("nlp.parse")
     @lru_cache(maxsize=128)
     def parse_command(self, text):
         """Extract task details from natural language"""
+        # Pull out repeat phrases first so "every Friday" isn't read as one date
+        recurrence, remaining = self.detect_recurrence(text)
+        
         # Try to extract date/time
-        date = parse(text, settings={'PREFER_DATES_FROM': 'future'})
+        date = parse(remaining, settings={'PREFER_DATES_FROM': 'future'}) if remaining else None
         due_date = date.date().isoformat() if date else None
+        if recurrence and not due_date:
+            due_date = recurrence.start.isoformat()
         
         # Remove date phrases from description
-        description = self.remove_date_phrases(text)
+        description = self.remove_date_phrases(remaining)
         
         # Auto-detect priority
         priority = self.detect_priority(text)
@@ -20,9 +28,16 @@ class NLPProcessor:
         return {
             "description": description,
             "due_date": due_date,
-            "priority": priority
+            "priority": priority,
+            "recurrence": recurrence
         }
     
+    def detect_recurrence(self, text):
+        """Detect repeat phrases ("every Friday", "every weekday", "first Monday
+        monthly"); returns (RecurrenceRule or None, text without the phrase)"""
+        # "weekly report" is a kind of report, not a repeat
+        return RecurrenceRule.from_text(text, bare_words=False)
+    
     def remove_date_phrases(self, text):
         """Remove date/time phrases from text"""
         patterns = [
@@ -0,0 +1,215 @@
+import calendar
+import re
+from datetime import date, timedelta
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+ORDINALS = {"first": 1, "1st": 1, "second": 2, "2nd": 2, "third": 3, "3rd": 3,
+            "fourth": 4, "4th": 4, "fifth": 5, "5th": 5, "last": -1}
+
+_DAY = r"(?:mon|tues|wednes|thurs|fri|satur|sun)day"
+_ORDINAL = r"(first|second|third|fourth|fifth|last|1st|2nd|3rd|4th|5th)"
+
+class RecurrenceRule:
+    """Repeat pattern for a task, e.g. every weekday or the first Monday monthly
+
+    Occurrences are generated lazily, so a daily rule with no end date costs
+    nothing until someone iterates over a date window.
+    """
+
+    FREQUENCIES = ("daily", "weekly", "monthly")
+
+    def __init__(self, freq, start, interval=1, weekdays=None, nth=None, until=None):
+        """
+        :param freq: 'daily', 'weekly' or 'monthly'
+        :param start: First occurrence (YYYY-MM-DD); anchors intervals and month days
+        :param interval: Repeat every N days/weeks/months
+        :param weekdays: Weekday numbers (0=Monday). Weekly rules repeat on each
+                         of them (default: start's weekday); monthly rules with
+                         nth use the first one
+        :param nth: For monthly rules, which occurrence of the weekday in the
+                    month (1-5, -1 = last). Without it, monthly rules repeat on
+                    start's day of the month (clamped to short months)
+        :param until: Last allowed occurrence (YYYY-MM-DD), inclusive
+        """
+        if freq not in self.FREQUENCIES:
+            raise ValueError("Frequency must be daily, weekly, or monthly")
+        if interval < 1:
+            raise ValueError("Interval must be at least 1")
+        self.freq = freq
+        self.start = date.fromisoformat(start) if isinstance(start, str) else start
+        self.interval = interval
+        self.weekdays = sorted(set(weekdays)) if weekdays else [self.start.weekday()]
+        self.nth = nth
+        self.until = date.fromisoformat(until) if isinstance(until, str) else until
+        if freq == "monthly" and nth is not None and nth not in (1, 2, 3, 4, 5, -1):
+            raise ValueError("nth must be 1-5 or -1")
+
+    def occurrences(self, after=None, until=None):
+        """
+        Yield occurrence dates in order, lazily
+
+        :param after: Earliest date to yield (inclusive, default: start)
+        :param until: Stop after this date (inclusive). Without it (and
+                      without the rule's own until) the generator is infinite.
+        """
+        after = max(after, self.start) if after else self.start
+        limits = [d for d in (until, self.until) if d]
+        limit = min(limits) if limits else None
+        generate = {"daily": self._daily, "weekly": self._weekly, "monthly": self._monthly}[self.freq]
+        for occurrence in generate(after):
+            if limit and occurrence > limit:
+                return
+            yield occurrence
+
+    def next_after(self, day):
+        """First occurrence strictly after day, or None when the rule has ended"""
+        return next(self.occurrences(after=day + timedelta(days=1)), None)
+
+    def _daily(self, after):
+        steps = -(-(after - self.start).days // self.interval)  # Round up
+        day = self.start + timedelta(days=steps * self.interval)
+        step = timedelta(days=self.interval)
+        while True:
+            yield day
+            day += step
+
+    def _weekly(self, after):
+        first_monday = self.start - timedelta(days=self.start.weekday())
+        weeks = (after - first_monday).days // 7
+        weeks -= weeks % self.interval  # Back to a week the rule is active in
+        monday = first_monday + timedelta(weeks=weeks)
+        step = timedelta(weeks=self.interval)
+        while True:
+            for weekday in self.weekdays:
+                day = monday + timedelta(days=weekday)
+                if day >= after:
+                    yield day
+            monday += step
+
+    def _monthly(self, after):
+        months = (after.year - self.start.year) * 12 + after.month - self.start.month
+        months -= months % self.interval
+        index = self.start.year * 12 + self.start.month - 1 + months
+        while True:
+            year, month = divmod(index, 12)
+            day = self._day_in_month(year, month + 1)
+            if day and day >= after:
+                yield day
+            index += self.interval
+
+    def _day_in_month(self, year, month):
+        days_in_month = calendar.monthrange(year, month)[1]
+        if self.nth is None:
+            return date(year, month, min(self.start.day, days_in_month))
+        weekday = self.weekdays[0]
+        if self.nth == -1:
+            last = date(year, month, days_in_month)
+            return last - timedelta(days=(last.weekday() - weekday) % 7)
+        first = date(year, month, 1)
+        day = 1 + (weekday - first.weekday()) % 7 + (self.nth - 1) * 7
+        return date(year, month, day) if day <= days_in_month else None  # No 5th Monday
+
+    def describe(self):
+        """Human-readable summary, e.g. 'every weekday' or 'first Monday monthly'"""
+        names = [WEEKDAYS[d].capitalize() for d in self.weekdays]
+        if self.freq == "daily":
+            return "every day" if self.interval == 1 else f"every {self.interval} days"
+        if self.freq == "weekly":
+            if self.weekdays == [0, 1, 2, 3, 4] and self.interval == 1:
+                return "every weekday"
+            every = "every" if self.interval == 1 else f"every {self.interval} weeks on"
+            return f"{every} {', '.join(names)}"
+        if self.nth is not None:
+            ordinal = {1: "first", 2: "second", 3: "third", 4: "fourth", 5: "fifth", -1: "last"}[self.nth]
+            text = f"{ordinal} {names[0]}"
+        else:
+            text = f"day {self.start.day}"
+        return f"{text} monthly" if self.interval == 1 else f"{text} every {self.interval} months"
+
+    def to_dict(self):
+        return {
+            "freq": self.freq,
+            "start": self.start.isoformat(),
+            "interval": self.interval,
+            "weekdays": self.weekdays,
+            "nth": self.nth,
+            "until": self.until.isoformat() if self.until else None
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def __eq__(self, other):
+        return isinstance(other, RecurrenceRule) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"RecurrenceRule({self.describe()!r}, start='{self.start}')"
+
+    @classmethod
+    def from_text(cls, text, today=None, bare_words=True):
+        """
+        Recognize a recurrence phrase such as "every Friday", "every weekday",
+        "every 2 weeks", "daily" or "first Monday of every month"
+
+        :param today: Date the first occurrence may fall on (default: today)
+        :param bare_words: Accept "daily", "weekly" or "monthly" anywhere, for
+                           text that only holds a repeat phrase. Free text
+                           passes False so "Prepare weekly report" stays a
+                           one-off task: there the words only count after
+                           "every"/"each" or at the end ("Water plants daily").
+        :return: (rule or None, text with the phrase removed)
+        """
+        today = today or date.today()
+        for pattern, build in _PHRASES + [_BARE_WORD if bare_words else _TRAILING_WORD]:
+            match = pattern.search(text)
+            if match:
+                rule = build(match, today)
+                remaining = (text[:match.start()] + text[match.end():]).strip()
+                return rule, re.sub(r"\s{2,}", " ", remaining)
+        return None, text
+
+
+def _weekday_numbers(text):
+    return [WEEKDAYS.index(name.lower()) for name in re.findall(_DAY, text, re.IGNORECASE)]
+
+
+def _weekly_from(weekdays, today, interval=1):
+    first = min(today + timedelta(days=(d - today.weekday()) % 7) for d in weekdays)
+    return RecurrenceRule("weekly", first, interval=interval, weekdays=weekdays)
+
+
+def _nth_weekday(match, today):
+    nth = ORDINALS[match.group(1).lower()]
+    weekday = WEEKDAYS.index(match.group(2).lower())
+    # Anchor on this month; occurrences() skips a date already past
+    rule = RecurrenceRule("monthly", today.replace(day=1), weekdays=[weekday], nth=nth)
+    return RecurrenceRule("monthly", next(rule.occurrences(after=today)),
+                          weekdays=[weekday], nth=nth)
+
+
+def _every_unit(match, today):
+    count = match.group(1)
+    interval = 2 if count and count.lower() == "other" else int(count or 1)
+    unit = match.group(2).lower()
+    freq = {"day": "daily", "week": "weekly", "month": "monthly"}[unit]
+    return RecurrenceRule(freq, today, interval=interval)
+
+
+_PHRASES = [
+    (re.compile(rf"\b(?:every\s+|on\s+the\s+)?{_ORDINAL}\s+({_DAY})\s+(?:of\s+(?:every|each|the)\s+month|monthly|every\s+month)\b",
+                re.IGNORECASE), _nth_weekday),
+    (re.compile(rf"\bevery\s+{_ORDINAL}\s+({_DAY})(?:\s+of\s+the\s+month)?\b", re.IGNORECASE), _nth_weekday),
+    (re.compile(r"\bevery\s+(?:week\s*day|weekday)s?\b|\bon\s+weekdays\b", re.IGNORECASE),
+     lambda m, today: _weekly_from([0, 1, 2, 3, 4], today)),
+    (re.compile(r"\bevery\s+weekends?\b|\bon\s+weekends\b", re.IGNORECASE),
+     lambda m, today: _weekly_from([5, 6], today)),
+    (re.compile(rf"\bevery\s+(other\s+)?{_DAY}(?:\s*(?:,|and|&)\s*{_DAY})*\b", re.IGNORECASE),
+     lambda m, today: _weekly_from(_weekday_numbers(m.group(0)), today, 2 if m.group(1) else 1)),
+    (re.compile(r"\bevery\s+(?:(\d+|other)\s+)?(day|week|month)s?\b", re.IGNORECASE), _every_unit),
+]
+_BARE_WORD = (re.compile(r"\b(daily|weekly|monthly)\b", re.IGNORECASE),
+              lambda m, today: RecurrenceRule(m.group(1).lower(), today))
+_TRAILING_WORD = (re.compile(r"\b(?:every|each)\s+(daily|weekly|monthly)\b|\b(daily|weekly|monthly)\W*$",
+                             re.IGNORECASE),
+                  lambda m, today: RecurrenceRule(m.group(m.lastindex).lower(), today))
@@ -0,0 +1,161 @@
+import heapq
+import itertools
+import threading
+from datetime import date, datetime, time
+
+
+class ReminderScheduler:
+    """Background thread that announces pending tasks as they come due
+
+    Pending tasks with a due date sit in a min-heap keyed on their reminder
+    time (the due date at remind_at). The thread sleeps until the earliest
+    one instead of polling. Changes arrive through TodoList.subscribe: an
+    add or edit pushes a fresh entry and a delete or completion marks the
+    old entry stale (it is skipped when it reaches the top), so each update
+    costs O(log n). A reload or merge rebuilds the heap in O(n).
+    """
+
+    MAX_SLEEP = 300  # Re-check the clock at least this often (seconds), e.g. after a suspend
+
+    def __init__(self, todo, notify, remind_at=time(9, 0), since=None):
+        """
+        :param todo: TodoList to watch
+        :param notify: Called as notify(task) from the scheduler thread
+        :param remind_at: Time of day a task's reminder fires on its due date
+        :param since: Reminders due before this datetime are skipped
+                      (default: start of today, so today's fire at startup)
+        """
+        self.todo = todo
+        self.notify = notify
+        self.remind_at = remind_at
+        self.since = since or datetime.combine(date.today(), time())
+        self._heap = []       # [when, sequence, task]; task is None once stale
+        self._entries = {}    # uid -> live heap entry
+        self._fired = {}      # uid -> reminder time already announced
+        self._stale = 0
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def __len__(self):
+        """Number of reminders still scheduled"""
+        with self._condition:
+            return len(self._entries)
+
+    def reminder_time(self, task):
+        """When a task's reminder fires (None for completed or undated tasks)"""
+        if task.completed or not task.due_date:
+            return None
+        return datetime.combine(date.fromisoformat(task.due_date), self.remind_at)
+
+    # --- Heap maintenance (caller holds self._condition) ---
+
+    def _discard(self, uid):
+        entry = self._entries.pop(uid, None)
+        if entry is not None:
+            entry[2] = None
+            self._stale += 1
+
+    def _schedule(self, task):
+        """Replace any entry for the task; returns True if the next deadline moved earlier"""
+        self._discard(task.uid)
+        when = self.reminder_time(task)
+        if when is None or when < self.since or self._fired.get(task.uid) == when:
+            return False
+        entry = [when, next(self._counter), task]
+        self._entries[task.uid] = entry
+        heapq.heappush(self._heap, entry)
+        if self._stale > len(self._entries):
+            self._compact()
+        return self._heap[0] is entry
+
+    def _compact(self):
+        """Drop stale entries once they outnumber live ones"""
+        self._heap = [entry for entry in self._heap if entry[2] is not None]
+        heapq.heapify(self._heap)
+        self._stale = 0
+
+    def rebuild(self, tasks):
+        """Schedule every pending task from scratch (O(n))"""
+        with self._condition:
+            self._heap = []
+            self._entries = {}
+            self._stale = 0
+            for task in tasks:
+                when = self.reminder_time(task)
+                if when is not None and when >= self.since and self._fired.get(task.uid) != when:
+                    entry = [when, next(self._counter), task]
+                    self._entries[task.uid] = entry
+                    self._heap.append(entry)
+            heapq.heapify(self._heap)
+            self._condition.notify()
+
+    def on_change(self, event, old, new):
+        """TodoList listener keeping the heap in step with the list"""
+        if event == "reset":
+            # Runs under the list's write lock, so reading tasks directly is safe
+            self.rebuild(self.todo.tasks)
+            return
+        with self._condition:
+            if old is not None:
+                self._discard(old.uid)
+                if new is None:
+                    self._fired.pop(old.uid, None)
+            if new is not None and self._schedule(new):
+                self._condition.notify()
+
+    # --- Thread ---
+
+    def start(self):
+        """Load pending tasks and start the scheduler thread"""
+        if self._running:
+            return
+        self._running = True
+        self.todo.subscribe(self.on_change)
+        self.rebuild(self.todo.snapshot())
+        self._thread = threading.Thread(target=self.run, name="reminders", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the thread and stop following the task list"""
+        if not self._running:
+            return
+        self.todo.unsubscribe(self.on_change)
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        self._thread.join(timeout=1)
+
+    def pop_due(self, now):
+        """Remove and return the tasks whose reminder time has passed"""
+        due = []
+        with self._condition:
+            while self._heap and self._heap[0][0] <= now:
+                when, _, task = heapq.heappop(self._heap)
+                if task is None:
+                    self._stale -= 1
+                    continue
+                del self._entries[task.uid]
+                self._fired[task.uid] = when
+                due.append(task)
+        return due
+
+    def run(self):
+        while True:
+            with self._condition:
+                if not self._running:
+                    return
+                now = datetime.now()
+                if not self._heap or self._heap[0][0] > now:
+                    timeout = self.MAX_SLEEP
+                    if self._heap:
+                        timeout = min(timeout, (self._heap[0][0] - now).total_seconds())
+                    self._condition.wait(timeout)
+                    continue
+            # Notify outside the lock so slow callbacks (speech) never block updates
+            for task in self.pop_due(now):
+                try:
+                    self.notify(task)
+                except Exception as e:
+                    print(f"Reminder error: {e}")
@@ -0,0 +1,91 @@
+import threading
+from contextlib import contextmanager
+
+class ReadWriteLock:
+    """Reader/writer lock: many concurrent readers or one exclusive writer"""
+
+    def __init__(self):
+        """
+        Initialize an unlocked reader/writer lock.
+
+        Writers are preferred: once a writer is waiting, new readers block so
+        a steady stream of searches cannot starve saves. The writing thread may
+        re-acquire the lock (for reading or writing) without deadlocking, and a
+        reading thread may nest further reads. Upgrading a read to a write is
+        not supported and raises RuntimeError.
+        """
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._writer_depth = 0
+        self._waiting_writers = 0
+        self._local = threading.local()
+
+    def acquire_read(self):
+        """Block until the lock can be held for reading"""
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._writer_depth += 1
+                return
+            held = getattr(self._local, "reads", 0)
+            if not held:
+                while self._writer is not None or self._waiting_writers:
+                    self._cond.wait()
+            self._readers += 1
+            self._local.reads = held + 1
+
+    def release_read(self):
+        """Release a read hold"""
+        with self._cond:
+            if self._writer == threading.get_ident():
+                self._writer_depth -= 1
+                return
+            self._readers -= 1
+            self._local.reads -= 1
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        """Block until the lock can be held exclusively"""
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._writer_depth += 1
+                return
+            if getattr(self._local, "reads", 0):
+                raise RuntimeError("Cannot upgrade a read lock to a write lock")
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._writer_depth = 1
+
+    def release_write(self):
+        """Release an exclusive hold"""
+        with self._cond:
+            self._writer_depth -= 1
+            if self._writer_depth == 0:
+                self._writer = None
+                self._cond.notify_all()
+
+    @contextmanager
+    def read_lock(self):
+        """Context manager holding the lock for reading"""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write_lock(self):
+        """Context manager holding the lock exclusively"""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
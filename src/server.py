@@ -0,0 +1,363 @@
+import argparse
+import asyncio
+import io
+import json
+import uuid
+from datetime import datetime
+from urllib.parse import urlsplit, parse_qs
+from src.app import TodoList
+from src.storage import Storage
+from src.recurrence import RecurrenceRule
+
+class HTTPError(Exception):
+    """Error carrying the HTTP status to answer with"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class TodoServer:
+    """Local HTTP/JSON API over a TodoList
+
+    Endpoints (tasks are addressed by uid):
+
+        GET    /tasks?completed=&sort=&offset=&limit=
+        POST   /tasks                      {"description": ..., "priority": ...}
+        GET    /tasks/<uid>
+        PATCH  /tasks/<uid>                {"completed": true, ...} ("recurrence": null stops repeating)
+        DELETE /tasks/<uid>
+        GET    /search?q=&category=&tags=a,b&priority=&due_within=&archived=&offset=&limit=
+        GET    /stats
+        GET    /export?format=csv|json
+
+    Connections are served concurrently on one event loop; TodoList calls run
+    in the default thread pool so file I/O never blocks other requests. GET
+    responses carry an ETag of the list revision, prefixed with a random
+    per-server id because revisions restart at 0 with every process, and a
+    matching If-None-Match gets a bodiless 304 so clients can poll cheaply.
+    """
+
+    REASONS = {
+        200: "OK", 201: "Created", 204: "No Content", 304: "Not Modified",
+        400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+        413: "Payload Too Large", 414: "URI Too Long",
+        431: "Request Header Fields Too Large", 500: "Internal Server Error"
+    }
+    MAX_BODY = 1 << 20
+    DEFAULT_LIMIT = 50
+    MAX_LIMIT = 1000
+    TASK_FIELDS = {"description", "priority", "due_date", "category", "tags", "completed", "recurrence"}
+
+    def __init__(self, todo, host="127.0.0.1", port=8765):
+        """
+        :param todo: TodoList to serve
+        :param host: Interface to bind (default: localhost only)
+        :param port: TCP port (0 picks a free one)
+        """
+        self.todo = todo
+        self.host = host
+        self.port = port
+        self.server = None
+        self.instance = uuid.uuid4().hex[:12]  # Keeps ETags from a previous run from matching
+
+    async def start(self):
+        """Start listening; returns once the socket is bound"""
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    async def serve_forever(self):
+        """Start (if needed) and serve until cancelled"""
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def run(self, func, *args):
+        """Run a blocking TodoList call in the thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+
+    # --- HTTP plumbing ---
+
+    async def handle_connection(self, reader, writer):
+        """Serve requests on one connection until it closes"""
+        try:
+            while True:
+                try:
+                    request = await self.read_request(reader)
+                except HTTPError as e:
+                    self.write_response(writer, e.status, {}, {"error": e.message}, False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, target, headers, body, keep_alive = request
+                status, response_headers, payload = await self.dispatch(method, target, headers, body)
+                self.write_response(writer, status, response_headers, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def read_request(self, reader):
+        """Parse one request; returns None when the client has gone away"""
+        line = await self.read_line(reader, 414, "Request line too long")
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+
+        headers = {}
+        while True:
+            line = await self.read_line(reader, 431, "Header line too long")
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length < 0:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length > self.MAX_BODY:
+            raise HTTPError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            keep_alive = connection == "keep-alive"
+        else:
+            keep_alive = connection != "close"
+        return method.upper(), target, headers, body, keep_alive
+
+    async def read_line(self, reader, status, message):
+        """Read one line, answering status if it exceeds the stream's limit"""
+        try:
+            return await reader.readline()
+        except (ValueError, asyncio.LimitOverrunError):
+            raise HTTPError(status, message)
+
+    def write_response(self, writer, status, headers, payload, keep_alive):
+        """Serialize a response onto the connection"""
+        headers = dict(headers)
+        if payload is None:
+            body = b""
+        elif isinstance(payload, str):
+            body = payload.encode("utf-8")
+            headers.setdefault("Content-Type", "text/plain; charset=utf-8")
+        else:
+            body = json.dumps(payload).encode("utf-8")
+            headers.setdefault("Content-Type", "application/json")
+        lines = [
+            f"HTTP/1.1 {status} {self.REASONS[status]}",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}"
+        ]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+
+    async def dispatch(self, method, target, headers, body):
+        """Route a request; returns (status, headers, payload)"""
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+
+        try:
+            if parts == ["tasks"]:
+                if method == "GET":
+                    return await self.conditional(headers, self.list_tasks, query)
+                if method == "POST":
+                    return 201, {}, await self.run(self.create_task, self.parse_json(body))
+            elif len(parts) == 2 and parts[0] == "tasks":
+                uid = parts[1]
+                if method == "GET":
+                    return await self.conditional(headers, self.get_task, uid)
+                if method == "PATCH":
+                    return 200, {}, await self.run(self.update_task, uid, self.parse_json(body))
+                if method == "DELETE":
+                    await self.run(self.delete_task, uid)
+                    return 204, {}, None
+            elif parts == ["search"]:
+                if method == "GET":
+                    return await self.conditional(headers, self.search, query)
+            elif parts == ["stats"]:
+                if method == "GET":
+                    return await self.conditional(headers, self.todo.get_stats)
+            elif parts == ["export"]:
+                if method == "GET":
+                    return await self.conditional(headers, self.export, query)
+            else:
+                raise HTTPError(404, "Not found")
+            raise HTTPError(405, f"Method {method} not allowed")
+        except HTTPError as e:
+            return e.status, {}, {"error": e.message}
+        except IndexError:
+            return 404, {}, {"error": "Task not found"}
+        except (ValueError, TypeError) as e:
+            return 400, {}, {"error": str(e)}
+        except Exception as e:
+            return 500, {}, {"error": str(e)}
+
+    async def conditional(self, headers, handler, *args):
+        """Answer a GET, or 304 if the client's ETag is still current"""
+        await self.run(self.todo.reload_if_changed)
+        etag = f'"{self.instance}-{self.todo.revision}"'
+        if_none_match = headers.get("if-none-match", "")
+        if if_none_match == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return 304, {"ETag": etag}, None
+        payload = await self.run(handler, *args)
+        if isinstance(payload, tuple):
+            content_type, payload = payload
+            return 200, {"ETag": etag, "Content-Type": content_type}, payload
+        return 200, {"ETag": etag}, payload
+
+    def parse_json(self, body):
+        """Decode a JSON object request body"""
+        try:
+            data = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Body must be valid JSON")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Body must be a JSON object")
+        return data
+
+    # --- Handlers (run in the thread pool) ---
+
+    def serialize(self, task):
+        return Storage.task_to_dict(task)
+
+    def page_bounds(self, query):
+        """(offset, limit) requested in the query string"""
+        try:
+            offset = max(int(query.get("offset", 0)), 0)
+            limit = min(max(int(query.get("limit", self.DEFAULT_LIMIT)), 0), self.MAX_LIMIT)
+        except ValueError:
+            raise HTTPError(400, "offset and limit must be integers")
+        return offset, limit
+
+    def page(self, tasks, total, offset, limit):
+        return {
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "tasks": [self.serialize(t) for t in tasks]
+        }
+
+    def paginate(self, tasks, query):
+        offset, limit = self.page_bounds(query)
+        return self.page(tasks[offset:offset + limit], len(tasks), offset, limit)
+
+    def validate_fields(self, data):
+        unknown = set(data) - self.TASK_FIELDS
+        if unknown:
+            raise HTTPError(400, f"Unknown field(s): {', '.join(sorted(unknown))}")
+        if data.get("priority") is not None and data["priority"] not in ["low", "medium", "high"]:
+            raise HTTPError(400, "Priority must be low, medium, or high")
+        if data.get("due_date"):
+            datetime.strptime(data["due_date"], "%Y-%m-%d")
+        if data.get("tags") is not None and not isinstance(data["tags"], list):
+            raise HTTPError(400, "tags must be a list")
+        recurrence = data.get("recurrence")
+        if isinstance(recurrence, str):
+            # Accept phrases like "every weekday" as well as rule objects
+            data["recurrence"], _ = RecurrenceRule.from_text(recurrence)
+            if data["recurrence"] is None:
+                raise HTTPError(400, f"Unrecognized recurrence: {recurrence}")
+        elif isinstance(recurrence, dict):
+            data["recurrence"] = RecurrenceRule.from_dict(recurrence)
+        elif recurrence is not None:
+            raise HTTPError(400, "recurrence must be a phrase or an object")
+        if data.get("recurrence") and not data.get("due_date") and "description" in data:
+            data["due_date"] = data["recurrence"].start.isoformat()
+        return data
+
+    def list_tasks(self, query):
+        completed = query.get("completed")
+        if completed is not None:
+            completed = completed.lower() in ("1", "true", "yes")
+        offset, limit = self.page_bounds(query)
+        with self.todo.lock.read_lock():
+            # Page and total from the same version; only offset + limit rows are read
+            tasks = self.todo.view_page(completed, query.get("sort", "added"), offset, limit)
+            total = self.todo.count_tasks(completed)
+        return self.page(tasks, total, offset, limit)
+
+    def get_task(self, uid):
+        with self.todo.lock.read_lock():
+            task = self.todo.get_task(self.todo.index_of(uid))
+        return self.serialize(task)
+
+    def create_task(self, data):
+        data = self.validate_fields(data)
+        description = data.pop("description", None)
+        if not isinstance(description, str):
+            raise HTTPError(400, "description is required")
+        return self.serialize(self.todo.add_task(description, **data))
+
+    def update_task(self, uid, data):
+        data = self.validate_fields(data)
+        if "recurrence" in data and data["recurrence"] is None:
+            # {"recurrence": null} ends the series
+            del data["recurrence"]
+            data["clear_recurrence"] = True
+        with self.todo.lock.write_lock():
+            task = self.todo.edit_task(self.todo.index_of(uid), **data)
+        return self.serialize(task)
+
+    def delete_task(self, uid):
+        with self.todo.lock.write_lock():
+            self.todo.delete_task(self.todo.index_of(uid))
+
+    def search(self, query):
+        tags = query.get("tags")
+        due_within = query.get("due_within")
+        results = self.todo.search_tasks(
+            search_term=query.get("q", ""),
+            category=query.get("category"),
+            tags=[tag.strip() for tag in tags.split(",")] if tags else None,
+            priority=query.get("priority"),
+            due_within=int(due_within) if due_within else None,
+            include_archived=query.get("archived", "").lower() in ("1", "true", "yes")
+        )
+        return self.paginate(results, query)
+
+    def export(self, query):
+        if query.get("format", "csv") == "json":
+            return [self.serialize(t) for t in self.todo.snapshot()]
+        buffer = io.StringIO()
+        self.todo.write_csv(buffer)
+        return "text/csv; charset=utf-8", buffer.getvalue()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the to-do list over HTTP/JSON")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--file", default="tasks.json", help="Task file (default: tasks.json)")
+    args = parser.parse_args(argv)
+
+    server = TodoServer(TodoList(Storage.for_file(args.file)), args.host, args.port)
+
+    async def serve():
+        await server.start()
+        print(f"Serving {args.file} on http://{server.host}:{server.port}", flush=True)
+        await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print("Server stopped")
+
+
+if __name__ == "__main__":
+    main()
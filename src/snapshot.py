@@ -0,0 +1,445 @@
+"""Compact binary task snapshots that load in near-constant time.
+
+A snapshot stores tasks column by column: fixed-width arrays (flags, due
+day, string ids, timestamps) plus one string pool shared by descriptions,
+categories, tags, uids and recurrence rules. The file is memory-mapped and
+tasks are decoded one at a time as they are read, so opening a million-task
+file costs little more than opening an empty one, and ``get_stats`` can
+count straight from the columns without building Task objects.
+
+Layout (native byte order, checked on open)::
+
+    header   magic, version, byte-order mark, task count, string count
+    table    (offset, length) of each section, in SECTIONS order
+    sections 8-byte aligned arrays
+
+JSON remains the interchange format; convert with
+``python -m src.snapshot tasks.json tasks.tdb`` (or the other way round).
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from collections import Counter, defaultdict
+from collections.abc import MutableSequence
+from datetime import date, datetime, timedelta
+from src.archive import completed_before
+from src.recurrence import RecurrenceRule
+from src.storage import Storage
+from src.task import Task
+
+MAGIC = b"TODOSNAP"
+FORMAT_VERSION = 1
+# Written in the writer's native order, like the columns: it reads back as
+# these bytes only on a machine with the same byte order
+BYTE_ORDER_MARK = struct.pack("=I", 0x01020304)
+HEADER = struct.Struct("<8sI4sII")
+
+# Section name -> array typecode; each task column holds one value per task
+SECTIONS = [
+    ("string_offsets", "I"),  # n_strings + 1 offsets into the pool
+    ("string_pool", "B"),
+    ("flags", "B"),           # bit 0 completed, bits 1-2 priority
+    ("due", "i"),             # days since 1970-01-01, NO_DATE if undated
+    ("description", "I"),
+    ("category", "I"),
+    ("uid", "I"),
+    ("recurrence", "I"),      # string id of the rule as JSON, or NO_STRING
+    ("start_time", "q"),      # microseconds since 1970-01-01, NO_TIME if unset
+    ("end_time", "q"),
+    ("tag_offsets", "I"),     # count + 1 offsets into tag_ids
+    ("tag_ids", "I"),
+]
+TABLE = struct.Struct("<" + "QQ" * len(SECTIONS))
+
+PRIORITIES = ["low", "medium", "high"]
+PRIORITY_CODES = {name: code for code, name in enumerate(PRIORITIES)}
+NO_DATE = 2 ** 31 - 1
+NO_TIME = -2 ** 63
+NO_STRING = 2 ** 32 - 1
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+EPOCH = datetime(1970, 1, 1)
+
+
+def _encode_time(value):
+    if value is None:
+        return NO_TIME
+    delta = value.replace(tzinfo=None) - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def _decode_time(value):
+    return None if value == NO_TIME else EPOCH + timedelta(microseconds=value)
+
+
+class Snapshot:
+    """Read-only view of a snapshot file, decoding records on demand"""
+
+    def __init__(self, filename):
+        """
+        Open and map a snapshot file.
+
+        Windows cannot replace a file that is mapped, so there the file is
+        read into memory instead; decoding stays lazy either way.
+        """
+        with open(filename, "rb") as f:
+            st = os.fstat(f.fileno())
+            self.version = (st.st_mtime_ns, st.st_size, st.st_ino)
+            if os.name == "nt" or st.st_size == 0:
+                self._buffer = f.read()
+            else:
+                self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._buffer) < HEADER.size + TABLE.size:
+            raise ValueError(f"{filename} is not a task snapshot")
+        magic, version, mark, self.count, self.n_strings = HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{filename} is not a version {FORMAT_VERSION} task snapshot")
+        if mark != BYTE_ORDER_MARK:
+            raise ValueError(f"{filename} was written on a machine with a different byte order")
+
+        view = memoryview(self._buffer)
+        table = TABLE.unpack_from(self._buffer, HEADER.size)
+        for i, (name, typecode) in enumerate(SECTIONS):
+            offset, length = table[2 * i], table[2 * i + 1]
+            setattr(self, name, view[offset:offset + length].cast(typecode))
+        self._strings = {}
+        self._records = None  # uid -> record id, built on first record_of
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.count
+
+    def string_bytes(self, sid):
+        return bytes(self.string_pool[self.string_offsets[sid]:self.string_offsets[sid + 1]])
+
+    def string(self, sid):
+        """Decode a pooled string (cached: categories and tags repeat a lot)"""
+        value = self._strings.get(sid)
+        if value is None:
+            value = self.string_bytes(sid).decode("utf-8")
+            if len(self._strings) < 65536:
+                self._strings[sid] = value
+        return value
+
+    def record_of(self, uid):
+        """Record id of the task with this uid, or None"""
+        if self._records is None:
+            with self._lock:
+                if self._records is None:
+                    self._records = {self.string_bytes(sid).decode("utf-8"): i
+                                     for i, sid in enumerate(self.uid)}
+        return self._records.get(uid)
+
+    def task(self, i):
+        """Decode record i into a Task"""
+        flags = self.flags[i]
+        due = self.due[i]
+        recurrence = self.recurrence[i]
+        tags = self.tag_ids[self.tag_offsets[i]:self.tag_offsets[i + 1]]
+        return Task(
+            self.string(self.description[i]),
+            completed=bool(flags & 1),
+            priority=PRIORITIES[flags >> 1 & 3],
+            due_date=None if due == NO_DATE else date.fromordinal(due + EPOCH_ORDINAL).isoformat(),
+            category=self.string(self.category[i]),
+            tags=[self.string(t) for t in tags],
+            start_time=_decode_time(self.start_time[i]),
+            end_time=_decode_time(self.end_time[i]),
+            uid=self.string(self.uid[i]),
+            recurrence=None if recurrence == NO_STRING else
+                RecurrenceRule.from_dict(json.loads(self.string(recurrence)))
+        )
+
+    def task_dicts(self):
+        """Every record as a task dict (for merging)"""
+        return [Storage.task_to_dict(self.task(i)) for i in range(self.count)]
+
+    def column_stats(self, overdue_before, exclude=()):
+        """
+        get_stats counts computed straight from the columns
+
+        :param overdue_before: Pending tasks due on or before this date are overdue
+        :param exclude: Record ids to leave out (e.g. ones replaced by an edit)
+        :return: dict with total, completed, by_priority, by_category, overdue
+        """
+        cutoff = overdue_before.toordinal() - EPOCH_ORDINAL
+        flag_counts = Counter(bytes(self.flags))
+        category_counts = Counter(self.category)
+        overdue = sum(1 for due, flags in zip(self.due, self.flags)
+                      if due <= cutoff and not flags & 1)
+
+        for i in exclude:
+            flags = self.flags[i]
+            flag_counts[flags] -= 1
+            category_counts[self.category[i]] -= 1
+            if self.due[i] <= cutoff and not flags & 1:
+                overdue -= 1
+
+        by_priority = defaultdict(int)
+        for flags, n in flag_counts.items():
+            if n:
+                by_priority[PRIORITIES[flags >> 1 & 3]] += n
+        by_category = defaultdict(int)
+        for sid, n in category_counts.items():
+            category = self.string(sid)
+            if n and category:
+                by_category[category] += n
+        return {
+            "total": sum(flag_counts.values()),
+            "completed": sum(n for flags, n in flag_counts.items() if flags & 1),
+            "by_priority": by_priority,
+            "by_category": by_category,
+            "overdue": overdue
+        }
+
+
+def write_snapshot(f, items, source=None):
+    """
+    Write tasks to an open binary file in snapshot format
+
+    :param items: Task objects, or record ids of ``source`` (copied across
+                  without decoding them into Tasks)
+    :param source: Snapshot the record ids refer to
+    """
+    pool = {}
+    chunks = []
+    remap = {}
+
+    def intern(data):
+        sid = pool.get(data)
+        if sid is None:
+            sid = pool[data] = len(chunks)
+            chunks.append(data)
+        return sid
+
+    def copy_string(sid):
+        new = remap.get(sid)
+        if new is None:
+            new = remap[sid] = intern(source.string_bytes(sid))
+        return new
+
+    columns = {name: array(typecode) for name, typecode in SECTIONS[2:]}
+    flags, due, description, category, uid, recurrence, start_time, end_time, tag_offsets, tag_ids = (
+        columns[name] for name, _ in SECTIONS[2:])
+    tag_offsets.append(0)
+
+    for item in items:
+        if type(item) is int:
+            flags.append(source.flags[item])
+            due.append(source.due[item])
+            description.append(copy_string(source.description[item]))
+            category.append(copy_string(source.category[item]))
+            uid.append(copy_string(source.uid[item]))
+            rule = source.recurrence[item]
+            recurrence.append(NO_STRING if rule == NO_STRING else copy_string(rule))
+            start_time.append(source.start_time[item])
+            end_time.append(source.end_time[item])
+            tag_ids.extend(copy_string(t) for t in
+                           source.tag_ids[source.tag_offsets[item]:source.tag_offsets[item + 1]])
+        else:
+            flags.append(bool(item.completed) | PRIORITY_CODES[item.priority] << 1)
+            due.append(NO_DATE if not item.due_date else
+                       date.fromisoformat(item.due_date).toordinal() - EPOCH_ORDINAL)
+            description.append(intern(item.description.encode("utf-8")))
+            category.append(intern((item.category or "").encode("utf-8")))
+            uid.append(intern(item.uid.encode("utf-8")))
+            recurrence.append(NO_STRING if item.recurrence is None else
+                              intern(json.dumps(item.recurrence.to_dict()).encode("utf-8")))
+            start_time.append(_encode_time(item.start_time))
+            end_time.append(_encode_time(item.end_time))
+            tag_ids.extend(intern(tag.encode("utf-8")) for tag in item.tags)
+        tag_offsets.append(len(tag_ids))
+
+    string_offsets = array("I", [0])
+    total = 0
+    for chunk in chunks:
+        total += len(chunk)
+        string_offsets.append(total)
+    sections = [string_offsets.tobytes(), b"".join(chunks)]
+    sections += [columns[name].tobytes() for name, _ in SECTIONS[2:]]
+
+    table = []
+    offset = HEADER.size + TABLE.size
+    for data in sections:
+        offset += -offset % 8
+        table += [offset, len(data)]
+        offset += len(data)
+    f.write(HEADER.pack(MAGIC, FORMAT_VERSION, BYTE_ORDER_MARK, len(flags), len(chunks)))
+    f.write(TABLE.pack(*table))
+    for data in sections:
+        f.write(b"\0" * (-f.tell() % 8))
+        f.write(data)
+
+
+class LazyTaskList(MutableSequence):
+    """Task list backed by a snapshot; records are decoded as they are read
+
+    Entries are either Task objects or the record id (an int) of a record
+    still unchanged from the snapshot, so list operations never force
+    decoding. Reading a record decodes a fresh Task each time without
+    storing it: full scans (search, export, building indexes) leave the
+    columns in charge, and only tasks written back by an edit or insert are
+    kept as objects.
+    """
+
+    def __init__(self, snapshot, items=None):
+        """
+        :param snapshot: Snapshot the int entries refer to
+        :param items: Initial entries (default: every record, in file order)
+        """
+        self.snapshot = snapshot
+        self._items = list(range(len(snapshot))) if items is None else items
+        # Record ids no longer represented by an int entry (replaced or removed)
+        self._excluded = {i for i, item in enumerate(self._items) if type(item) is not int} \
+            if items is not None else set()
+
+    def _get(self, index):
+        item = self._items[index]
+        return self.snapshot.task(item) if type(item) is int else item
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._get(i) for i in range(*index.indices(len(self._items)))]
+        return self._get(index)
+
+    def __setitem__(self, index, task):
+        if isinstance(index, slice):
+            raise TypeError("LazyTaskList does not support slice assignment")
+        old = self._items[index]
+        if type(old) is int:
+            self._excluded.add(old)
+        self._items[index] = task
+
+    def __delitem__(self, index):
+        removed = self._items[index] if isinstance(index, slice) else [self._items[index]]
+        self._excluded.update(item for item in removed if type(item) is int)
+        del self._items[index]
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        task = self.snapshot.task
+        for item in self._items:
+            yield task(item) if type(item) is int else item
+
+    def insert(self, index, task):
+        self._items.insert(index, task)
+
+    def delete_positions(self, positions):
+        """Remove many entries in one pass"""
+        drop = set(positions)
+        self._excluded.update(item for position, item in enumerate(self._items)
+                              if position in drop and type(item) is int)
+        self._items = [item for position, item in enumerate(self._items) if position not in drop]
+
+    def index_of_uid(self, uid):
+        """Position of the task with this uid (None if absent), without decoding"""
+        record = self.snapshot.record_of(uid)
+        if record is not None and record not in self._excluded:
+            return self._items.index(record)
+        for position, item in enumerate(self._items):
+            if type(item) is not int and item.uid == uid:
+                return position
+        return None
+
+    def frozen_iter(self):
+        """Iterate over the entries as they are now, decoding records as they are reached"""
+        task = self.snapshot.task
+        return (task(item) if type(item) is int else item for item in list(self._items))
+
+    def raw_items(self):
+        """Entries as stored: Tasks and undecoded record ids"""
+        return self._items
+
+    def completed_before(self, cutoff):
+        """
+        Positions of tasks archive.completed_before would select, checking
+        undecoded records against the columns
+
+        :param cutoff: datetime
+        """
+        snapshot = self.snapshot
+        end_cutoff = _encode_time(cutoff)
+        due_cutoff = cutoff.date().toordinal() - EPOCH_ORDINAL
+        positions = []
+        for position, item in enumerate(self._items):
+            if type(item) is not int:
+                if completed_before(item, cutoff):
+                    positions.append(position)
+            elif snapshot.flags[item] & 1:
+                end_time = snapshot.end_time[item]
+                if end_time < end_cutoff if end_time != NO_TIME else snapshot.due[item] < due_cutoff:
+                    positions.append(position)
+        return positions
+
+    def column_stats(self, overdue_before):
+        """
+        Split get_stats work between the columns and decoded tasks
+
+        :return: (counts for unchanged records, Task entries still to count),
+                 or None when most records were replaced and columns won't help
+        """
+        if len(self._excluded) > len(self.snapshot) // 2:
+            return None
+        counts = self.snapshot.column_stats(overdue_before, self._excluded)
+        return counts, [item for item in self._items if type(item) is not int]
+
+
+class SnapshotStorage(Storage):
+    """Storage on the binary snapshot format (see module docstring)
+
+    Loads return a LazyTaskList; saves copy undecoded records across without
+    decoding them. Locking, change detection and merging work as for JSON.
+    """
+
+    def _read_dicts(self):
+        try:
+            snapshot = Snapshot(self.filename)
+        except FileNotFoundError:
+            return [], None
+        return snapshot.task_dicts(), snapshot.version
+
+    def _read_tasks(self):
+        try:
+            snapshot = Snapshot(self.filename)
+        except FileNotFoundError:
+            self._base = {}
+            return [], None
+        self._base = snapshot
+        return LazyTaskList(snapshot), snapshot.version
+
+    def _base_dicts(self):
+        if isinstance(self._base, Snapshot):
+            return {d['uid']: d for d in self._base.task_dicts()}
+        return self._base
+
+    def _write_tasks(self, tasks):
+        if isinstance(tasks, LazyTaskList):
+            items, source = tasks.raw_items(), tasks.snapshot
+        else:
+            items, source = list(tasks), None
+        self._atomic_write('wb', lambda f: write_snapshot(f, items, source))
+        # The file now holds the list in order: undecoded entries become
+        # positions in the new snapshot, decoded Tasks are kept as they are
+        snapshot = Snapshot(self.filename)
+        self._base = snapshot
+        return LazyTaskList(snapshot, [i if type(item) is int else item
+                                       for i, item in enumerate(items)])
+
+
+def convert(source, target):
+    """Convert between JSON and snapshot files (chosen by extension)"""
+    tasks = Storage.for_file(source).load_tasks()
+    Storage.for_file(target).save_tasks(list(tasks))
+    return len(tasks)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python -m src.snapshot SOURCE TARGET   (.json <-> .tdb)")
+        sys.exit(2)
+    print(f"Converted {convert(sys.argv[1], sys.argv[2])} tasks")
@@ -0,0 +1,169 @@
+import itertools
+import threading
+from bisect import bisect_left
+
+PRIORITY_RANK = {"high": 0, "medium": 1, "low": 2}
+
+
+def priority_key(task):
+    return PRIORITY_RANK[task.priority]
+
+
+def due_key(task):
+    # Undated tasks sort after every date
+    return (0, task.due_date) if task.due_date else (1, "")
+
+
+def category_key(task):
+    return (task.category or "").lower()
+
+
+SORT_KEYS = {
+    "priority": priority_key,
+    "due_date": due_key,
+    "category": category_key,
+    "priority_due": lambda task: (priority_key(task), due_key(task)),
+    "due_priority": lambda task: (due_key(task), priority_key(task)),
+}
+ADDED = ("added", "created")  # List order; needs no view
+
+
+class SortedView:
+    """Tasks kept ordered by one key, updated by binary-search insertion
+
+    Entries are ordered by (key, sequence), where the sequence number follows
+    the task's position in the list so equal keys keep list order. The task
+    list is replaced rather than modified on every change, so an iterator
+    handed out earlier keeps reading the version it started on.
+    """
+
+    def __init__(self, key):
+        """
+        :param key: Function mapping a task to a comparable sort key
+        """
+        self.key = key
+        self.keys = []   # (key, sequence) in order
+        self.tasks = []  # Tasks in the same order
+
+    def build(self, entries):
+        """Fill from (sequence, task) pairs (O(n log n))"""
+        ordered = sorted(((self.key(task), seq), task) for seq, task in entries)
+        self.keys = [key for key, _ in ordered]
+        self.tasks = [task for _, task in ordered]
+
+    def insert(self, task, seq):
+        entry = (self.key(task), seq)
+        i = bisect_left(self.keys, entry)
+        self.keys.insert(i, entry)
+        self.tasks = self.tasks[:i] + [task] + self.tasks[i:]
+
+    def remove(self, task, seq):
+        i = bisect_left(self.keys, (self.key(task), seq))
+        del self.keys[i]
+        self.tasks = self.tasks[:i] + self.tasks[i + 1:]
+
+    def replace(self, old, new, seq):
+        """Swap in a task's new version, moving it only if its key changed"""
+        key = self.key(new)
+        if key == self.key(old):
+            i = bisect_left(self.keys, (key, seq))
+            tasks = list(self.tasks)
+            tasks[i] = new
+            self.tasks = tasks
+        else:
+            self.remove(old, seq)
+            self.insert(new, seq)
+
+
+class SortedViews:
+    """The sorted views of one TodoList, built on demand and kept current
+
+    A view is built the first time its order is asked for. After that,
+    change events move one task at a time: a binary search finds its place
+    and the view's list is rebuilt around it, with no re-sort. The number of
+    completed tasks is kept the same way, so filtered totals need no scan. A
+    reload or merge drops every view, and each is rebuilt the next time it
+    is used.
+    """
+
+    def __init__(self):
+        self._views = {}
+        self._sequence = None   # uid -> number increasing with list position
+        self._completed = 0     # Completed tasks, kept alongside _sequence
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self.todo = None
+
+    def follow(self, todo):
+        self.todo = todo
+        todo.subscribe(self.on_change)
+
+    def view(self, sort_by):
+        """
+        Tasks in the given order (the caller holds the list's read lock)
+
+        :return: A list that is never modified afterwards
+        """
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"Unknown sort order: {sort_by}")
+        with self._lock:
+            view = self._views.get(sort_by)
+            if view is None:
+                self._ensure_sequence()
+                view = SortedView(SORT_KEYS[sort_by])
+                view.build((self._sequence[task.uid], task) for task in self.todo.tasks)
+                self._views[sort_by] = view
+            return view.tasks
+
+    def count(self, completed):
+        """Number of completed (or pending) tasks (the caller holds the list's read lock)"""
+        with self._lock:
+            self._ensure_sequence()
+            return self._completed if completed else len(self._sequence) - self._completed
+
+    def _ensure_sequence(self):
+        if self._sequence is None:
+            self._counter = itertools.count()
+            self._sequence = {}
+            self._completed = 0
+            for task in self.todo.tasks:
+                self._sequence[task.uid] = next(self._counter)
+                self._completed += task.completed
+
+    def _sequence_for(self, task):
+        """Sequence number matching the task's list position (usually the end)"""
+        tasks = self.todo.tasks
+        if tasks and tasks[-1] is task:
+            return next(self._counter)
+        # Re-inserted in the middle (undo of a delete): fit between its neighbours
+        i = self.todo.index_of(task.uid)
+        before = self._sequence[tasks[i - 1].uid] if i > 0 else None
+        after = self._sequence[tasks[i + 1].uid] if i + 1 < len(tasks) else None
+        if after is None:
+            return next(self._counter)
+        return after - 1 if before is None else (before + after) / 2
+
+    def on_change(self, event, old, new):
+        """TodoList listener: move only the changed task in each view"""
+        with self._lock:
+            if event == "reset":
+                self._views = {}
+                self._sequence = None
+                return
+            if self._sequence is None:
+                return  # Nothing built yet
+            if event == "add":
+                seq = self._sequence[new.uid] = self._sequence_for(new)
+                self._completed += new.completed
+                for view in self._views.values():
+                    view.insert(new, seq)
+            elif event == "delete":
+                seq = self._sequence.pop(old.uid)
+                self._completed -= old.completed
+                for view in self._views.values():
+                    view.remove(old, seq)
+            else:
+                seq = self._sequence[old.uid]
+                self._completed += new.completed - old.completed
+                for view in self._views.values():
+                    view.replace(old, new, seq)
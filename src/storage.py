@@ -1,60 +1,313 @@
 import json
 import os
+import stat
+import tempfile
+import threading
+import uuid
+from collections.abc import MutableSequence
+from contextlib import contextmanager
+from src import instrumentation
 from src.task import Task
+from src.recurrence import RecurrenceRule
 from datetime import datetime
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Namespace for deriving uids of tasks saved before tasks carried one
+LEGACY_UID_NAMESPACE = uuid.UUID("6f1c2a4e-8d3b-4f7a-9c52-0b7e1d9a3f10")
+
+# Read once at import: os.umask can only be queried by setting it
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+
+@contextmanager
+def atomic_file(filename, mode, prefix):
+    """
+    Open a temp file to write; when the block succeeds it atomically replaces filename
+
+    The result looks like open(filename, "w") had written it: an existing
+    file keeps its permission bits (a new one gets the umask default, not
+    mkstemp's 0600) and a symlinked file is replaced at its target, leaving
+    the link in place.
+
+    :param filename: File to replace
+    :param mode: File mode for the temp file ('w' or 'wb')
+    :param prefix: Temp file name prefix
+    """
+    target = os.path.realpath(filename)
+    fd, tmp_name = tempfile.mkstemp(dir=os.path.dirname(target), prefix=prefix, suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+        try:
+            permissions = stat.S_IMODE(os.stat(target).st_mode)
+        except FileNotFoundError:
+            permissions = 0o666 & ~UMASK
+        os.chmod(tmp_name, permissions)
+        os.replace(tmp_name, target)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+        raise
+
+
 class Storage:
-    """Handles persistent storage of tasks using JSON file"""
-    
-    def __init__(self, filename="tasks.json"):
+    """Handles persistent storage of tasks using JSON file
+
+    Several processes (e.g. two CLI instances, or the CLI and an importer)
+    may share one file. Saves hold an advisory lock on a sidecar
+    ``<filename>.lock`` file and replace the data file atomically. Storage
+    remembers the version of the file it last loaded or saved; if another
+    process saved in between, its changes are merged with ours field by field
+    instead of being overwritten.
+    """
+
+    def __init__(self, filename="tasks.json", on_merge=None):
         """
         Initialize storage handler.
-        
+
         :param filename: JSON file name (default: tasks.json)
+        :param on_merge: Called as on_merge(conflicts) after a save merged in
+                         another session's changes, e.g. to tell the user
         """
         self.filename = filename
-        
+        self.lock_filename = filename + ".lock"
+        self.version = None  # File version as of our last load/save
+        self._base = None    # {uid: task dict} as of self.version
+        self.merged = False  # Whether the last save merged in another session's changes
+        self.conflicts = 0   # Fields both sides changed in that merge (ours kept)
+        self.on_merge = on_merge
+        self._mutex = threading.RLock()
+        self._lock_depth = 0
+        self._lock_file = None
+
+    @staticmethod
+    def task_to_dict(task):
+        """Convert a task to a JSON-serializable dict"""
+        task_dict = task.__dict__.copy()
+        # Convert datetime objects to strings
+        if task_dict['start_time'] and isinstance(task_dict['start_time'], datetime):
+            task_dict['start_time'] = task_dict['start_time'].isoformat()
+        if task_dict['end_time'] and isinstance(task_dict['end_time'], datetime):
+            task_dict['end_time'] = task_dict['end_time'].isoformat()
+        task_dict['tags'] = list(task_dict['tags'])
+        if task_dict['recurrence'] is not None:
+            task_dict['recurrence'] = task_dict['recurrence'].to_dict()
+        return task_dict
+
+    @staticmethod
+    def task_from_dict(task_dict):
+        """Build a task from a dict produced by task_to_dict"""
+        task_dict = task_dict.copy()
+        # Handle old tasks that don't have the new fields
+        if 'start_time' not in task_dict:
+            task_dict['start_time'] = None
+        if 'end_time' not in task_dict:
+            task_dict['end_time'] = None
+        # Convert string timestamps back to datetime objects
+        if task_dict['start_time'] and isinstance(task_dict['start_time'], str):
+            task_dict['start_time'] = datetime.fromisoformat(task_dict['start_time'])
+        if task_dict['end_time'] and isinstance(task_dict['end_time'], str):
+            task_dict['end_time'] = datetime.fromisoformat(task_dict['end_time'])
+        if task_dict.get('recurrence'):
+            task_dict['recurrence'] = RecurrenceRule.from_dict(task_dict['recurrence'])
+        return Task(**task_dict)
+
+    def current_version(self):
+        """Cheap fingerprint of the file on disk (None if it doesn't exist)"""
+        try:
+            st = os.stat(self.filename)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def has_changed(self):
+        """Check whether the file changed since our last load or save"""
+        return self.current_version() != self.version
+
+    @contextmanager
+    def lock(self):
+        """Hold the inter-process file lock (re-entrant within a process)"""
+        with self._mutex:
+            if self._lock_depth == 0:
+                self._lock_file = open(self.lock_filename, "a+")
+                try:
+                    if fcntl:
+                        fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+                    else:
+                        self._lock_file.seek(0)
+                        msvcrt.locking(self._lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                except OSError:
+                    self._lock_file.close()
+                    self._lock_file = None
+                    raise
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0:
+                    try:
+                        if fcntl:
+                            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+                        else:
+                            self._lock_file.seek(0)
+                            msvcrt.locking(self._lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+                    finally:
+                        self._lock_file.close()
+                        self._lock_file = None
+
+    def _read_dicts(self):
+        """Read raw task dicts and the version they were read at"""
+        try:
+            f = open(self.filename)
+        except FileNotFoundError:
+            return [], None
+        with f:
+            st = os.fstat(f.fileno())
+            task_dicts = json.load(f)
+        for i, task_dict in enumerate(task_dicts):
+            if not task_dict.get('uid'):
+                # Derive a uid every process agrees on until the file is re-saved
+                task_dict['uid'] = uuid.uuid5(
+                    LEGACY_UID_NAMESPACE, f"{i}:{task_dict.get('description')}").hex
+        return task_dicts, (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _atomic_write(self, mode, write):
+        """Write a temp file next to the data file with write(f), then swap it in"""
+        with atomic_file(self.filename, mode, ".tasks-") as f:
+            write(f)
+            instrumentation.record("storage.save.bytes", f.tell())
+
+    def _write_dicts(self, task_dicts):
+        """Atomically replace the data file"""
+        self._atomic_write('w', lambda f: json.dump(task_dicts, f, indent=2))
+
+    def _write_tasks(self, tasks):
+        """Persist tasks and remember them as the merge base; returns the list to keep"""
+        task_dicts = [self.task_to_dict(task) for task in tasks]
+        self._write_dicts(task_dicts)
+        self._base = {d['uid']: d for d in task_dicts}
+        return tasks
+
+    def _read_tasks(self):
+        """Read tasks, remember them as the merge base; returns (tasks, version)"""
+        task_dicts, version = self._read_dicts()
+        tasks = [self.task_from_dict(task_dict) for task_dict in task_dicts]
+        self._base = {task.uid: self.task_to_dict(task) for task in tasks}
+        return tasks, version
+
+    def _base_dicts(self):
+        """{uid: task dict} as of our last load or save"""
+        return self._base
+
+    @instrumentation.timed("storage.save")
     def save_tasks(self, tasks):
-        """Serialize tasks to JSON file"""
-        if not isinstance(tasks, list):
+        """
+        Serialize tasks to JSON file, merging changes saved by other processes
+
+        :return: The task list actually persisted (``tasks`` itself unless a
+                 merge was needed)
+        """
+        if not isinstance(tasks, MutableSequence):
             raise ValueError("Tasks must be a list")
         try:
-            with open(self.filename, 'w') as f:
-                task_dicts = []
-                for task in tasks:
-                    task_dict = task.__dict__.copy()
-                    # Convert datetime objects to strings
-                    if task_dict['start_time'] and isinstance(task_dict['start_time'], datetime):
-                        task_dict['start_time'] = task_dict['start_time'].isoformat()
-                    if task_dict['end_time'] and isinstance(task_dict['end_time'], datetime):
-                        task_dict['end_time'] = task_dict['end_time'].isoformat()
-                    task_dicts.append(task_dict)
-                json.dump(task_dicts, f, indent=2)
+            with self.lock():
+                self.merged = self._base is not None and self.has_changed()
+                self.conflicts = 0
+                if self.merged:
+                    their_dicts, _ = self._read_dicts()
+                    tasks, self.conflicts = merge_tasks(self._base_dicts(), tasks, their_dicts)
+                tasks = self._write_tasks(tasks)
+                self.version = self.current_version()
         except IOError as e:
+            instrumentation.count("storage.save.errors")
             print(f"Error saving tasks: {e}")
+            return tasks
+        if self.merged and self.on_merge:
+            self.on_merge(self.conflicts)
+        return tasks
 
+    @instrumentation.timed("storage.load")
     def load_tasks(self):
         """Load tasks from JSON file"""
-        if not os.path.exists(self.filename):
-            return []
-            
         try:
-            with open(self.filename) as f:
-                task_dicts = json.load(f)
-                tasks = []
-                for task_dict in task_dicts:
-                    # Handle old tasks that don't have the new fields
-                    if 'start_time' not in task_dict:
-                        task_dict['start_time'] = None
-                    if 'end_time' not in task_dict:
-                        task_dict['end_time'] = None
-                    # Convert string timestamps back to datetime objects
-                    if task_dict['start_time'] and isinstance(task_dict['start_time'], str):
-                        task_dict['start_time'] = datetime.fromisoformat(task_dict['start_time'])
-                    if task_dict['end_time'] and isinstance(task_dict['end_time'], str):
-                        task_dict['end_time'] = datetime.fromisoformat(task_dict['end_time'])
-                    tasks.append(Task(**task_dict))
-                return tasks
-        except (IOError, json.JSONDecodeError) as e:
+            with self.lock():
+                tasks, version = self._read_tasks()
+            self.version = version
+            return tasks
+        except (IOError, ValueError) as e:
+            instrumentation.count("storage.load.errors")
             print(f"Error loading tasks: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    @staticmethod
+    def for_file(filename, on_merge=None):
+        """Storage handler for a file: binary snapshot for .tdb, JSON otherwise"""
+        if filename.endswith(".tdb"):
+            from src.snapshot import SnapshotStorage
+            return SnapshotStorage(filename, on_merge)
+        return Storage(filename, on_merge)
+
+
+def merge_tasks(base, ours, their_dicts):
+    """
+    Three-way merge of our task list with one saved by another process
+
+    :param base: {uid: task dict} both sides started from
+    :param ours: Our list of Task objects
+    :param their_dicts: Task dicts currently on disk
+    :return: (merged task list, number of conflicting fields)
+
+    Edits to different fields of the same task are combined; when both sides
+    changed the same field our value wins. An edit beats a concurrent delete.
+    Tasks added on either side are kept, ours first.
+    """
+    theirs = {}
+    for their in their_dicts:
+        # Normalize through Task so missing legacy fields compare equal
+        theirs[their['uid']] = Storage.task_to_dict(Storage.task_from_dict(their))
+    merged = []
+    conflicts = 0
+    seen = set()
+
+    for task in ours:
+        uid = task.uid
+        seen.add(uid)
+        original = base.get(uid)
+        their = theirs.get(uid)
+        if their is None:
+            if original is None:
+                merged.append(task)  # Added by us
+            elif Storage.task_to_dict(task) != original:
+                merged.append(task)  # Deleted by them, but we edited it
+            continue
+        if original is None or their == original:
+            merged.append(task)  # Only we changed it (if at all)
+            continue
+        mine = Storage.task_to_dict(task)
+        if mine == original:
+            merged.append(Storage.task_from_dict(their))
+            continue
+        result = dict(mine)
+        for key in set(mine) | set(their):
+            if mine.get(key) == original.get(key):
+                result[key] = their.get(key)
+            elif their.get(key) not in (original.get(key), mine.get(key)):
+                conflicts += 1
+        merged.append(Storage.task_from_dict(result))
+
+    for uid, their in theirs.items():
+        if uid in seen:
+            continue
+        original = base.get(uid)
+        if original is None or their != original:
+            # Added by them, or deleted by us after they edited it
+            merged.append(Storage.task_from_dict(their))
+
+    return merged, conflicts
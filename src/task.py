@@ -1,17 +1,20 @@
-from datetime import datetime 
+from datetime import date, datetime, timedelta
+import uuid
 
 class Task:
     """Enhanced task with categories and tags support"""
     
     def __init__(self, description, completed=False, priority="medium", 
                  due_date=None, category="General", tags=None,
-                 start_time=None, end_time=None):  # Add these parameters
+                 start_time=None, end_time=None, uid=None, recurrence=None):  # Add these parameters
         """
         Initialize a task with extended attributes
         
         :param tags: List of tags (e.g., ["urgent", "home"])
         :param start_time: When task was started (datetime)
         :param end_time: When task was completed (datetime)
+        :param uid: Stable identifier used to match tasks across saves
+        :param recurrence: RecurrenceRule; due_date then holds the pending occurrence
         """
         if priority not in ["low", "medium", "high"]:
             raise ValueError("Priority must be low, medium, or high")
@@ -24,12 +27,35 @@ class Task:
         self.tags = tags or []
         self.start_time = start_time  # Initialize these attributes
         self.end_time = end_time
+        self.uid = uid or uuid.uuid4().hex
+        self.recurrence = recurrence
 
     def start(self):
         self.start_time = datetime.now()
     
     def complete(self):
         self.end_time = datetime.now()
+    
+    def due_dates(self, start=None, end=None):
+        """
+        Lazily yield due dates (date objects) falling between start and end
+        
+        A plain task yields its due date at most once. A recurring task yields
+        its pending occurrence (due_date) followed by the rule's later ones,
+        so callers must bound open-ended windows with end.
+        """
+        if not self.due_date:
+            return
+        due = date.fromisoformat(self.due_date)
+        if end is not None and due > end:
+            return
+        if start is None or due >= start:
+            yield due
+        if self.recurrence is not None:
+            after = due + timedelta(days=1)
+            if start is not None and start > after:
+                after = start
+            yield from self.recurrence.occurrences(after=after, until=end)
 
     def __repr__(self):
         return (f"Task(description='{self.description}', completed={self.completed}, "
@@ -15,6 +15,7 @@ class VoiceAssistant:
         self.nlp = NLPProcessor()
         self.active = False
         self.listening_thread = None
+        self.speech_lock = threading.Lock()  # Reminders speak from their own thread
         
     def listen(self):
         """Continuously listen for voice commands"""
@@ -54,28 +55,48 @@ class VoiceAssistant:
         command = command.lower()
         
         try:
-            if "add" in command:
+            if re.search(r"\b(undo|redo)\b", command):
+                undoing = re.search(r"\bundo\b", command) is not None
+                task = self.todo_list.undo() if undoing else self.todo_list.redo()
+                if task is None:
+                    self.speak(f"Nothing to {'undo' if undoing else 'redo'}")
+                else:
+                    self.speak(f"{'Undid' if undoing else 'Redid'} change to {task.description}")
+                
+            elif "add" in command:
                 task_text = command.replace("add", "").strip()
                 details = self.nlp.parse_command(task_text)
                 self.todo_list.add_task(
                     details["description"],
                     due_date=details["due_date"],
-                    priority=details["priority"]
+                    priority=details["priority"],
+                    recurrence=details["recurrence"]
                 )
                 self.speak(f"Added task: {details['description']}")
                 
             elif any(word in command for word in ["complete", "done", "finish"]):
                 match = re.search(r'\d+', command)
-                if match:
-                    task_id = int(match.group())
-                    self.todo_list.mark_completed(task_id)
-                    task_desc = self.todo_list.tasks[task_id].description
-                    self.speak(f"Completed task: {task_desc}")
+                # Resolve and complete under one lock so no other thread shifts positions in between
+                with self.todo_list.lock.write_lock():
+                    task_id = int(match.group()) if match else self.find_task(command, pending_only=True)
+                    task = self.todo_list.mark_completed(task_id) if task_id is not None else None
+                if task is not None:
+                    self.speak(f"Completed task: {task.description}")
+                else:
+                    self.speak("Which task? Say its number or name")
+                    
+            elif any(word in command for word in ["delete", "remove"]):
+                match = re.search(r'\d+', command)
+                with self.todo_list.lock.write_lock():
+                    task_id = int(match.group()) if match else self.find_task(command)
+                    task = self.todo_list.delete_task(task_id) if task_id is not None else None
+                if task is not None:
+                    self.speak(f"Deleted task: {task.description}")
                 else:
-                    self.speak("Please specify a task number")
+                    self.speak("Which task? Say its number or name")
                     
             elif "what" in command and "tasks" in command:
-                pending = [t for t in self.todo_list.tasks if not t.completed]
+                pending = [t for t in self.todo_list.snapshot() if not t.completed]
                 if pending:
                     self.speak(f"You have {len(pending)} pending tasks")
                 else:
@@ -91,11 +112,30 @@ class VoiceAssistant:
         except Exception as e:
             self.speak(f"Error: {str(e)}")
     
+    def find_task(self, command, pending_only=False):
+        """
+        Resolve a task named in a command, e.g. "complete buy groceries"
+        
+        Transcriptions are often slightly off, so the name is matched fuzzily.
+        Hold the list's write lock until the position has been used.
+        
+        :return: List position of the best match, or None
+        """
+        name = re.sub(r"\b(complete|done|finish|delete|remove|mark|task|as|the)\b", " ", command)
+        for task, _ in self.todo_list.fuzzy_search(name, limit=5, min_score=0.4):
+            if not (pending_only and task.completed):
+                try:
+                    return self.todo_list.index_of(task.uid)
+                except IndexError:
+                    continue
+        return None
+    
     def speak(self, text):
         """Convert text to speech"""
         try:
-            self.engine.say(text)
-            self.engine.runAndWait()
+            with self.speech_lock:
+                self.engine.say(text)
+                self.engine.runAndWait()
         except Exception as e:
             print(f"Speech error: {e}")
     